@@ -0,0 +1,36 @@
+"""Add generated text search vector for learning pattern data
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-16
+
+Adds a stored tsvector over pattern_data with a GIN index so that
+recommendation context matching can be ranked inside Postgres.
+"""
+
+from alembic import op
+
+# revision identifiers
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add pattern_data_tsv and its GIN index."""
+    op.execute("""
+        ALTER TABLE IF EXISTS learning_patterns_v2
+        ADD COLUMN IF NOT EXISTS pattern_data_tsv tsvector
+        GENERATED ALWAYS AS (to_tsvector('simple', pattern_data::text)) STORED
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_learning_patterns_v2_pattern_data_tsv
+        ON learning_patterns_v2 USING gin (pattern_data_tsv)
+    """)
+
+
+def downgrade():
+    """Drop pattern_data_tsv and its GIN index."""
+    op.execute("DROP INDEX IF EXISTS idx_learning_patterns_v2_pattern_data_tsv")
+    op.execute("ALTER TABLE IF EXISTS learning_patterns_v2 DROP COLUMN IF EXISTS pattern_data_tsv")
@@ -0,0 +1,31 @@
+"""Add trigram index for learning pattern name search
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16
+
+Indexes pattern_name with gin_trgm_ops so that the substring ILIKE in
+pattern search is index-backed instead of a sequential scan.
+"""
+
+from alembic import op
+
+# revision identifiers
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Enable pg_trgm and add the pattern_name trigram index."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_learning_patterns_v2_name_trgm
+        ON learning_patterns_v2 USING gin (pattern_name gin_trgm_ops)
+    """)
+
+
+def downgrade():
+    """Drop the pattern_name trigram index."""
+    op.execute("DROP INDEX IF EXISTS idx_learning_patterns_v2_name_trgm")
@@ -0,0 +1,44 @@
+"""Add generated relevance score for learning pattern search
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16
+
+Stores usage_count * success_rate * confidence_score as a generated column
+with descending indexes, so that relevance-ordered pattern search with a
+LIMIT is an index scan instead of a full sort. The partial index covers
+searches restricted to public and system patterns.
+"""
+
+from alembic import op
+
+# revision identifiers
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add relevance_score and its indexes."""
+    op.execute("""
+        ALTER TABLE IF EXISTS learning_patterns_v2
+        ADD COLUMN IF NOT EXISTS relevance_score double precision
+        GENERATED ALWAYS AS (usage_count * success_rate * confidence_score) STORED
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_learning_patterns_v2_relevance
+        ON learning_patterns_v2 (relevance_score DESC)
+    """)
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS idx_learning_patterns_v2_public_relevance
+        ON learning_patterns_v2 (relevance_score DESC)
+        WHERE access_level IN ('public', 'system')
+    """)
+
+
+def downgrade():
+    """Drop relevance_score and its indexes."""
+    op.execute("DROP INDEX IF EXISTS idx_learning_patterns_v2_public_relevance")
+    op.execute("DROP INDEX IF EXISTS idx_learning_patterns_v2_relevance")
+    op.execute("ALTER TABLE IF EXISTS learning_patterns_v2 DROP COLUMN IF EXISTS relevance_score")
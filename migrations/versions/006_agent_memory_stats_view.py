@@ -0,0 +1,50 @@
+"""Add materialized per-agent memory statistics
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-16
+
+Precomputes the slowly changing per-agent memory aggregates (totals,
+average length, access level and importance buckets) so that statistics
+dashboards read one row per agent instead of scanning memories_v2. The
+unique index on agent_id allows REFRESH MATERIALIZED VIEW CONCURRENTLY.
+"""
+
+from alembic import op
+
+# revision identifiers
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create agent_memory_stats and its unique index."""
+    op.execute("""
+        CREATE MATERIALIZED VIEW IF NOT EXISTS agent_memory_stats AS
+        SELECT
+            agent_id,
+            count(*) AS total_memories,
+            avg(length(content)) AS average_memory_length,
+            count(*) FILTER (WHERE access_level <> 'private') AS shared_memory_count,
+            count(*) FILTER (WHERE access_level = 'private') AS access_private,
+            count(*) FILTER (WHERE access_level = 'team') AS access_team,
+            count(*) FILTER (WHERE access_level = 'shared') AS access_shared,
+            count(*) FILTER (WHERE access_level = 'public') AS access_public,
+            count(*) FILTER (WHERE access_level = 'system') AS access_system,
+            count(*) FILTER (WHERE importance_score < 0.33) AS importance_low,
+            count(*) FILTER (WHERE importance_score >= 0.33 AND importance_score < 0.67) AS importance_medium,
+            count(*) FILTER (WHERE importance_score >= 0.67) AS importance_high
+        FROM memories_v2
+        GROUP BY agent_id
+    """)
+    op.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_agent_memory_stats_agent_id
+        ON agent_memory_stats (agent_id)
+    """)
+
+
+def downgrade():
+    """Drop agent_memory_stats."""
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS agent_memory_stats")
@@ -10,7 +10,7 @@ from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.responses import JSONResponse
 
 from ..core.config import get_settings
-from ..core.database import create_tables, close_db_connections, DatabaseHealthCheck
+from ..core.database import create_tables, close_db_connections, prewarm_pool, DatabaseHealthCheck
 from .middleware_unified import setup_middleware
 from .routers import health, memory, persona, task, workflow
 
@@ -37,6 +37,8 @@ async def lifespan(app: FastAPI):
             logger.error("Database health check failed during startup")
             raise Exception("Database connection failed")
         
+        await prewarm_pool()
+        
         logger.info("TMWS startup completed successfully")
         
         # Application is ready
@@ -14,6 +14,7 @@ from sqlalchemy import select, update, delete, func, and_, or_
 
 from ...core.database import get_db_session_dependency
 from ...models.memory import Memory, MemoryVector
+from ...services.semantic_cache import get_query_cache
 from ...services.vectorization_service import VectorizationService
 from ..security import get_current_user, sanitize_input
 
@@ -151,6 +152,7 @@ async def create_memory(
         db.add(memory)
         await db.commit()
         await db.refresh(memory)
+        get_query_cache().invalidate()
         
         logger.info(f"Memory created: {memory.id} by user {current_user.get('username')}")
         
@@ -278,6 +280,7 @@ async def update_memory(
         
         await db.commit()
         await db.refresh(memory)
+        get_query_cache().invalidate()
         
         logger.info(f"Memory updated: {memory.key} by user {current_user.get('id')}")
         
@@ -336,6 +339,7 @@ async def delete_memory(
         memory_key = memory.key
         await db.delete(memory)
         await db.commit()
+        get_query_cache().invalidate()
         
         logger.info(f"Memory deleted: {memory_key} by user {current_user.get('id')}")
         
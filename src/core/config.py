@@ -119,6 +119,7 @@ class Settings(BaseSettings):
     # ==== PERFORMANCE & CACHING ====
     cache_ttl: int = Field(default=3600, ge=1, le=86400)
     cache_max_size: int = Field(default=1000, ge=1, le=100000)
+    redis_url: Optional[str] = Field(default=None)  # Shared L2 cache / distributed rate limiting
     
     # ==== VALIDATION RULES ====
     @root_validator(pre=True)
@@ -2,6 +2,7 @@
 Database configuration and session management for TMWS.
 """
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator, Optional
@@ -61,8 +62,14 @@ def get_engine():
                         "application_name": "tmws",
                         "jit": "off",  # Disable JIT for better connection times
                     },
+                    # Reuse prepared statements across calls on a connection
+                    "statement_cache_size": 500,
+                    "prepared_statement_cache_size": 500,
                 },
-                "poolclass": pool.NullPool,  # Async engine requires NullPool
+                # Keep connections open between requests; see prewarm_pool()
+                "poolclass": pool.AsyncAdaptedQueuePool,
+                "pool_size": settings.db_max_connections,
+                "max_overflow": 0,
             })
         
         _engine = create_async_engine(settings.database_url_async, **engine_config)
@@ -157,6 +164,42 @@ class DatabaseHealthCheck:
         }
 
 
+async def prewarm_pool() -> int:
+    """
+    Open the full pool up front so early requests skip the connect cost.
+    
+    Each new asyncpg connection pays for TCP/TLS setup and type
+    introspection; doing that at startup keeps it off the first burst of
+    concurrent requests.
+    
+    Returns:
+        Number of connections opened
+    """
+    engine = get_engine()
+    if not isinstance(engine.pool, pool.QueuePool):
+        return 0
+    
+    # Connections must be held concurrently, otherwise the pool would just
+    # hand the same one back each time
+    connections = await asyncio.gather(
+        *(engine.connect() for _ in range(engine.pool.size())),
+        return_exceptions=True
+    )
+    opened = 0
+    for connection in connections:
+        if isinstance(connection, Exception):
+            logger.warning(f"Failed to prewarm database connection: {connection}")
+            continue
+        try:
+            await connection.execute(sa.text("SELECT 1"))
+            opened += 1
+        finally:
+            await connection.close()
+    
+    logger.info(f"Database pool prewarmed with {opened} connections")
+    return opened
+
+
 async def create_tables():
     """Create all tables in the database."""
     engine = get_engine()
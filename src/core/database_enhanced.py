@@ -10,6 +10,7 @@ from typing import Any, AsyncGenerator, Dict, Generator, Optional, Type
 from urllib.parse import urlparse
 
 import sqlalchemy as sa
+from prometheus_client import Gauge
 from sqlalchemy import create_engine, event, pool, MetaData
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
@@ -18,7 +19,7 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine
 )
 from sqlalchemy.orm import Session, sessionmaker, declarative_base
-from sqlalchemy.pool import QueuePool, NullPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, NullPool
 from alembic import command
 from alembic.config import Config
 
@@ -27,6 +28,11 @@ from .exceptions import DatabaseError, ConfigurationError
 
 logger = logging.getLogger(__name__)
 
+# Connection pool saturation, sampled at scrape time
+POOL_SIZE = Gauge("tmws_db_pool_size", "Configured connection pool size", ["engine"])
+POOL_CHECKED_IN = Gauge("tmws_db_pool_checked_in", "Idle connections in the pool", ["engine"])
+POOL_OVERFLOW = Gauge("tmws_db_pool_overflow", "Connections opened beyond pool_size", ["engine"])
+
 
 class DatabaseManager:
     """
@@ -125,6 +131,44 @@ class DatabaseManager:
         config = {**base_config, **workload_configs.get(workload_type, workload_configs["mixed"])}
         return config
     
+    def _create_async_pool_config(self, pool_config: Dict[str, Any], is_postgres: bool) -> Dict[str, Any]:
+        """
+        Derive the async engine pool configuration from the sync one.
+        
+        The sync connect_args are psycopg-specific, so asyncpg gets its own:
+        JIT off, and statement caches sized for the repeated queries of the
+        hot service paths. Pre-ping is skipped in favour of recycling, which
+        saves a round-trip on every checkout.
+        """
+        async_pool_config = {
+            k: v for k, v in pool_config.items()
+            if k not in ["poolclass", "connect_args"]
+        }
+        
+        if is_postgres:
+            async_pool_config.update({
+                "poolclass": AsyncAdaptedQueuePool,
+                "pool_pre_ping": False,
+                "pool_recycle": 1800,  # 30 minutes
+                "connect_args": {
+                    "command_timeout": 60,
+                    "server_settings": pool_config["connect_args"]["server_settings"],
+                    "statement_cache_size": 1024,
+                    "prepared_statement_cache_size": 1024
+                }
+            })
+        
+        return async_pool_config
+    
+    def _register_pool_metrics(self, engine_name: str, engine_pool: pool.Pool) -> None:
+        """Expose pool saturation gauges for a queue-based pool."""
+        if not isinstance(engine_pool, QueuePool):
+            return
+        
+        POOL_SIZE.labels(engine=engine_name).set_function(engine_pool.size)
+        POOL_CHECKED_IN.labels(engine=engine_name).set_function(engine_pool.checkedin)
+        POOL_OVERFLOW.labels(engine=engine_name).set_function(engine_pool.overflow)
+    
     def _setup_engine_events(self, engine: sa.Engine) -> None:
         """Setup engine event listeners for monitoring and optimization."""
         
@@ -209,10 +253,7 @@ class DatabaseManager:
                 if is_sqlite:
                     async_url = db_url.replace("sqlite://", "sqlite+aiosqlite://")
                 
-                async_pool_config = {
-                    k: v for k, v in pool_config.items() 
-                    if k not in ["poolclass", "connect_args"]
-                }
+                async_pool_config = self._create_async_pool_config(pool_config, is_postgres)
                 
                 self._async_engine = create_async_engine(
                     async_url,
@@ -221,6 +262,9 @@ class DatabaseManager:
                     future=True
                 )
                 
+                self._register_pool_metrics("sync", self._sync_engine.pool)
+                self._register_pool_metrics("async", self._async_engine.pool)
+                
                 # Create session factories
                 self._sync_session_factory = sessionmaker(
                     bind=self._sync_engine,
@@ -241,6 +285,7 @@ class DatabaseManager:
                     read_pool_config = self._create_optimized_pool_config("read_heavy")
                     self._read_engine = create_engine(read_url, **read_pool_config)
                     self._setup_engine_events(self._read_engine)
+                    self._register_pool_metrics("read", self._read_engine.pool)
                 
                 # Store write engine reference
                 self._write_engine = self._sync_engine
@@ -370,6 +415,15 @@ class DatabaseManager:
             # Check asynchronous engine
             if self._async_engine:
                 health_status["async_engine_available"] = True
+                pool = self._async_engine.pool
+                if hasattr(pool, 'size'):
+                    health_status["async_engine_pool"] = {
+                        "size": pool.size(),
+                        "checked_in": pool.checkedin(),
+                        "checked_out": pool.checkedout(),
+                        "overflow": pool.overflow(),
+                        "invalid": pool.invalid()
+                    }
             
             # Check read engine pool
             if self._read_engine and hasattr(self._read_engine.pool, 'size'):
@@ -9,7 +9,7 @@ from uuid import UUID
 
 import sqlalchemy as sa
 from sqlalchemy import String, Integer, Float, Text, Index, CheckConstraint
-from sqlalchemy.dialects.postgresql import JSONB, UUID as PGUUID
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID as PGUUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -86,6 +86,16 @@ class LearningPattern(TMWSBase, MetadataMixin):
         comment="Pattern data structure with enhanced schema"
     )
     
+    # Full-text search vector over pattern data, maintained by Postgres.
+    # Only used inside SQL, so it is deferred and never fetched with the row.
+    pattern_data_tsv: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        sa.Computed("to_tsvector('simple', pattern_data::text)", persisted=True),
+        nullable=True,
+        deferred=True,
+        comment="Generated text search vector of pattern_data"
+    )
+    
     # Pattern versioning
     version: Mapped[str] = mapped_column(
         String(50),
@@ -185,6 +195,14 @@ class LearningPattern(TMWSBase, MetadataMixin):
         comment="Confidence in pattern effectiveness"
     )
     
+    # Search ranking, maintained by Postgres so it can be served from an index
+    relevance_score: Mapped[Optional[float]] = mapped_column(
+        Float,
+        sa.Computed("usage_count * success_rate * confidence_score", persisted=True),
+        nullable=True,
+        comment="Generated relevance (usage_count * success_rate * confidence_score)"
+    )
+    
     # Relationships
     parent_pattern = relationship(
         "LearningPattern",
@@ -246,6 +264,17 @@ class LearningPattern(TMWSBase, MetadataMixin):
             "usage_count", "success_rate",
             postgresql_ops={"usage_count": "DESC", "success_rate": "DESC"}
         ),
+        Index(
+            "idx_learning_patterns_v2_relevance",
+            "relevance_score",
+            postgresql_ops={"relevance_score": "DESC"}
+        ),
+        Index(
+            "idx_learning_patterns_v2_public_relevance",
+            "relevance_score",
+            postgresql_ops={"relevance_score": "DESC"},
+            postgresql_where=sa.text("access_level IN ('public', 'system')")
+        ),
         Index(
             "idx_learning_patterns_v2_agent_performance",
             "agent_id", "agent_usage_count", "agent_success_rate",
@@ -261,6 +290,17 @@ class LearningPattern(TMWSBase, MetadataMixin):
             "pattern_data",
             postgresql_using="gin"
         ),
+        Index(
+            "idx_learning_patterns_v2_name_trgm",
+            "pattern_name",
+            postgresql_using="gin",
+            postgresql_ops={"pattern_name": "gin_trgm_ops"}
+        ),
+        Index(
+            "idx_learning_patterns_v2_pattern_data_tsv",
+            "pattern_data_tsv",
+            postgresql_using="gin"
+        ),
         Index(
             "idx_learning_patterns_v2_metadata",
             "metadata",
@@ -348,6 +388,21 @@ class LearningPattern(TMWSBase, MetadataMixin):
                    (self.shared_with_agents and agent_id in self.shared_with_agents))
         return False
     
+    @classmethod
+    def access_filter(cls, agent_id: Optional[str]) -> sa.ColumnElement[bool]:
+        """SQL equivalent of can_access, usable in WHERE clauses."""
+        return sa.or_(
+            cls.access_level.in_(["public", "system"]),
+            sa.and_(cls.access_level == "private", cls.agent_id == agent_id),
+            sa.and_(
+                cls.access_level == "shared",
+                sa.or_(
+                    cls.agent_id == agent_id,
+                    cls.shared_with_agents.contains([agent_id])
+                )
+            )
+        )
+    
     def create_version(self, new_version: str, pattern_data: Dict[str, Any]) -> "LearningPattern":
         """Create a new version of this pattern."""
         new_pattern = LearningPattern(
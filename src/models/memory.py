@@ -178,6 +178,24 @@ class Memory(TMWSBase, MetadataMixin):
         content_preview = self.content[:50] + "..." if len(self.content) > 50 else self.content
         return f"<Memory(agent='{self.agent_id}', content='{content_preview}')>"
     
+    # String forms of immutable columns, computed once per instance (and
+    # only once the value is assigned) since serialization needs them often
+    @property
+    def id_str(self) -> Optional[str]:
+        """Memory ID as a string."""
+        cached = self.__dict__.get("_id_str")
+        if cached is None and self.id is not None:
+            cached = self.__dict__["_id_str"] = str(self.id)
+        return cached
+    
+    @property
+    def created_at_iso(self) -> Optional[str]:
+        """Creation time in ISO 8601 format."""
+        cached = self.__dict__.get("_created_at_iso")
+        if cached is None and self.created_at is not None:
+            cached = self.__dict__["_created_at_iso"] = self.created_at.isoformat()
+        return cached
+    
     def update_access(self) -> None:
         """Update access metadata."""
         self.access_count += 1
@@ -211,7 +229,7 @@ class Memory(TMWSBase, MetadataMixin):
     def to_dict(self) -> Dict[str, Any]:
         """Convert memory to dictionary."""
         return {
-            "id": str(self.id),
+            "id": self.id_str,
             "content": self.content,
             "summary": self.summary,
             "agent_id": self.agent_id,
@@ -228,7 +246,7 @@ class Memory(TMWSBase, MetadataMixin):
             "pattern_ids": self.pattern_ids,
             "version": self.version,
             "parent_memory_id": str(self.parent_memory_id) if self.parent_memory_id else None,
-            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "created_at": self.created_at_iso,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "accessed_at": self.accessed_at.isoformat() if self.accessed_at else None,
             "expires_at": self.expires_at.isoformat() if self.expires_at else None,
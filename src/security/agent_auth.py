@@ -6,8 +6,9 @@ Provides secure multi-agent access control.
 import hashlib
 import secrets
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Sequence
 import jwt
+import numpy as np
 from passlib.context import CryptContext
 
 from ..core.config import settings
@@ -96,6 +97,42 @@ class AgentAuthService:
         else:  # PRIVATE
             return False
     
+    def check_memory_access_batch(
+        self,
+        agent_id: str,
+        agent_namespace: str,
+        memories: Sequence[Any]
+    ) -> np.ndarray:
+        """
+        Check an agent's access to many memories at once.
+        
+        Applies the same rules as check_memory_access to each memory.
+        
+        Returns:
+            Boolean mask, True where the agent can access the memory
+        """
+        if not memories:
+            return np.zeros(0, dtype=bool)
+        
+        owners = np.array([memory.agent_id for memory in memories])
+        namespaces = np.array([memory.namespace for memory in memories])
+        levels = np.array([
+            getattr(memory.access_level, "value", memory.access_level) for memory in memories
+        ])
+        allowed = (
+            (owners == agent_id)
+            | np.isin(levels, (AccessLevel.PUBLIC.value, AccessLevel.SYSTEM.value))
+            | ((levels == AccessLevel.TEAM.value) & (namespaces == agent_namespace))
+        )
+        
+        # Share lists are only scanned for shared memories not already
+        # allowed, the one case where membership decides the outcome
+        for i in np.flatnonzero((levels == AccessLevel.SHARED.value) & ~allowed):
+            shared_agents = memories[i].shared_with_agents
+            allowed[i] = bool(shared_agents) and agent_id in shared_agents
+        
+        return allowed
+    
     def generate_agent_token(self, agent_id: str, api_key: str) -> Optional[str]:
         """Generate a token after validating agent credentials."""
         # This would check against database in production
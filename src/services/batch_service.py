@@ -4,7 +4,9 @@ Optimized for high-throughput batch operations with intelligent queuing.
 """
 
 import asyncio
+import itertools
 import logging
+import time
 from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
 from enum import Enum
@@ -22,6 +24,7 @@ from ..models.agent import Agent
 from ..models.memory import Memory
 from ..models.learning_pattern import LearningPattern
 from ..models.task import Task, TaskStatus
+from .semantic_cache import get_query_cache
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +50,16 @@ class BatchPriority(str, Enum):
     CRITICAL = "critical"
 
 
+# Queue ordering for priorities; lower rank is dequeued first
+PRIORITY_RANKS: Dict[BatchPriority, int] = {
+    BatchPriority.CRITICAL: 0,
+    BatchPriority.URGENT: 1,
+    BatchPriority.HIGH: 2,
+    BatchPriority.MEDIUM: 3,
+    BatchPriority.LOW: 4
+}
+
+
 class BatchJobStatus(str, Enum):
     """Batch job execution statuses."""
     PENDING = "pending"
@@ -60,6 +73,16 @@ class BatchJobStatus(str, Enum):
 class BatchJob:
     """Represents a batch processing job."""
     
+    __slots__ = (
+        "job_id", "operation_type", "items", "columns", "processor_func", "priority",
+        "batch_size", "max_retries", "timeout_seconds", "metadata",
+        "status", "created_at", "started_at", "completed_at",
+        "_started_perf", "_completed_perf",
+        "processed_count", "success_count", "failure_count", "current_retry",
+        "error_messages", "progress_callback",
+        "progress_interval_seconds", "_last_progress_perf", "_lock",
+    )
+    
     def __init__(self,
                  job_id: str,
                  operation_type: BatchOperationType,
@@ -69,10 +92,14 @@ class BatchJob:
                  batch_size: int = 100,
                  max_retries: int = 3,
                  timeout_seconds: int = 300,
-                 metadata: Optional[Dict[str, Any]] = None):
+                 metadata: Optional[Dict[str, Any]] = None,
+                 columns: Optional[Dict[str, List[Any]]] = None):
         self.job_id = job_id
         self.operation_type = operation_type
         self.items = items
+        # Optional column-oriented copy of items (field -> values). When set,
+        # processors receive column slices instead of lists of item dicts.
+        self.columns = columns
         self.processor_func = processor_func
         self.priority = priority
         self.batch_size = batch_size
@@ -85,18 +112,30 @@ class BatchJob:
         self.created_at = datetime.now()
         self.started_at: Optional[datetime] = None
         self.completed_at: Optional[datetime] = None
+        self._started_perf: Optional[float] = None
+        self._completed_perf: Optional[float] = None
         self.processed_count = 0
         self.success_count = 0
         self.failure_count = 0
         self.current_retry = 0
         self.error_messages: List[str] = []
         self.progress_callback: Optional[Callable] = None
+        self.progress_interval_seconds = 0.1
+        self._last_progress_perf = 0.0
+        # Guards counter and error list updates from concurrent batches
+        self._lock = asyncio.Lock()
     
     @property
     def total_items(self) -> int:
         """Get total number of items to process."""
         return len(self.items)
     
+    def get_batch(self, start_index: int, end_index: int) -> Union[List[Dict[str, Any]], Dict[str, List[Any]]]:
+        """Get the processor payload for items[start_index:end_index]."""
+        if self.columns is not None:
+            return {field: values[start_index:end_index] for field, values in self.columns.items()}
+        return self.items[start_index:end_index]
+    
     @property
     def progress_percentage(self) -> float:
         """Get processing progress as percentage."""
@@ -117,12 +156,18 @@ class BatchJob:
         return self.status in [BatchJobStatus.COMPLETED, BatchJobStatus.FAILED, BatchJobStatus.CANCELLED]
     
     @property
-    def execution_time(self) -> Optional[timedelta]:
-        """Get job execution time."""
-        if not self.started_at:
+    def execution_seconds(self) -> Optional[float]:
+        """Get job execution time in seconds from the monotonic perf counter."""
+        if self._started_perf is None:
             return None
-        end_time = self.completed_at or datetime.now()
-        return end_time - self.started_at
+        end_perf = self._completed_perf if self._completed_perf is not None else time.perf_counter()
+        return end_perf - self._started_perf
+    
+    @property
+    def execution_time(self) -> Optional[timedelta]:
+        """Get job execution time (compatibility shim over execution_seconds)."""
+        seconds = self.execution_seconds
+        return timedelta(seconds=seconds) if seconds is not None else None
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert job to dictionary representation."""
@@ -140,12 +185,27 @@ class BatchJob:
             "created_at": self.created_at.isoformat(),
             "started_at": self.started_at.isoformat() if self.started_at else None,
             "completed_at": self.completed_at.isoformat() if self.completed_at else None,
-            "execution_time_seconds": self.execution_time.total_seconds() if self.execution_time else None,
+            "execution_time_seconds": self.execution_seconds,
             "current_retry": self.current_retry,
             "max_retries": self.max_retries,
             "error_messages": self.error_messages[-10:],  # Last 10 errors
             "metadata": self.metadata
         }
+    
+    async def notify_progress(self, force: bool = False) -> None:
+        """Invoke the progress callback, throttled to progress_interval_seconds."""
+        if not self.progress_callback:
+            return
+        
+        now = time.perf_counter()
+        if not force and now - self._last_progress_perf < self.progress_interval_seconds:
+            return
+        self._last_progress_perf = now
+        
+        try:
+            await self.progress_callback(self.to_dict())
+        except Exception as e:
+            logger.warning(f"Progress callback error: {e}")
 
 
 class BatchProcessor:
@@ -173,7 +233,11 @@ class BatchProcessor:
         
         # Runtime state
         self.jobs: Dict[str, BatchJob] = {}
-        self.job_queue: asyncio.Queue = asyncio.Queue()
+        # Entries are (priority_rank, sequence, job). The monotonic sequence
+        # breaks ties in FIFO order, so heap comparisons never reach BatchJob
+        # (which deliberately defines no ordering). Use put/get only.
+        self.job_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._job_sequence = itertools.count()
         self.running_jobs: Dict[str, asyncio.Task] = {}
         self.semaphore = asyncio.Semaphore(max_concurrent_jobs)
         self.batch_semaphore = asyncio.Semaphore(max_concurrent_batches)
@@ -204,12 +268,19 @@ class BatchProcessor:
         """Stop the batch processor gracefully."""
         self._shutdown = True
         
-        # Cancel all running jobs
+        # Cancel all running jobs first, then wait for them together
+        running_tasks = []
         for job_id, task in list(self.running_jobs.items()):
             logger.info(f"Cancelling running job: {job_id}")
             task.cancel()
+            running_tasks.append(task)
+        
+        if running_tasks:
             try:
-                await asyncio.wait_for(task, timeout=5.0)
+                await asyncio.wait_for(
+                    asyncio.gather(*running_tasks, return_exceptions=True),
+                    timeout=5.0
+                )
             except (asyncio.TimeoutError, asyncio.CancelledError):
                 pass
         
@@ -237,7 +308,8 @@ class BatchProcessor:
             raise ValidationError(f"Job with ID {job.job_id} already exists")
         
         self.jobs[job.job_id] = job
-        await self.job_queue.put(job)
+        rank = PRIORITY_RANKS.get(job.priority, PRIORITY_RANKS[BatchPriority.MEDIUM])
+        await self.job_queue.put((rank, next(self._job_sequence), job))
         
         logger.info(f"Submitted batch job {job.job_id}: {job.operation_type} with {job.total_items} items")
         return job.job_id
@@ -282,7 +354,7 @@ class BatchProcessor:
         while not self._shutdown:
             try:
                 # Get next job with timeout to allow shutdown checks
-                job = await asyncio.wait_for(self.job_queue.get(), timeout=1.0)
+                _, _, job = await asyncio.wait_for(self.job_queue.get(), timeout=1.0)
                 
                 if job.status != BatchJobStatus.PENDING:
                     continue
@@ -321,6 +393,7 @@ class BatchProcessor:
         """Execute a batch job with retry logic."""
         job.status = BatchJobStatus.RUNNING
         job.started_at = datetime.now()
+        job._started_perf = time.perf_counter()
         
         logger.info(f"Starting batch job {job.job_id}: {job.operation_type}")
         
@@ -352,7 +425,10 @@ class BatchProcessor:
         
         finally:
             job.completed_at = datetime.now()
+            job._completed_perf = time.perf_counter()
             self._update_performance_metrics(job)
+            # Always deliver the final state, regardless of throttling
+            await job.notify_progress(force=True)
     
     async def _process_job_batches(self, job: BatchJob) -> None:
         """Process job items in optimized batches."""
@@ -361,11 +437,12 @@ class BatchProcessor:
         # Create batch processing tasks
         batch_tasks = []
         for i in range(0, job.total_items, job.batch_size):
-            batch_items = job.items[i:i + job.batch_size]
             batch_id = f"{job.job_id}_batch_{i // job.batch_size + 1}"
             
+            # Pass index ranges; the slice is materialized only once the
+            # batch acquires the semaphore, not for every batch up front
             task = asyncio.create_task(
-                self._process_batch(job, batch_id, batch_items, i)
+                self._process_batch(job, batch_id, i, min(i + job.batch_size, job.total_items))
             )
             batch_tasks.append(task)
         
@@ -376,23 +453,22 @@ class BatchProcessor:
             except Exception as e:
                 logger.error(f"Batch processing error in job {job.job_id}: {e}")
             
-            # Update progress
-            if job.progress_callback:
-                try:
-                    await job.progress_callback(job.to_dict())
-                except Exception as e:
-                    logger.warning(f"Progress callback error: {e}")
+            # Update progress (coalesced; final state is sent by _execute_job)
+            await job.notify_progress()
     
     async def _process_batch(self, 
                            job: BatchJob, 
                            batch_id: str, 
-                           items: List[Dict[str, Any]], 
-                           start_index: int) -> None:
-        """Process a single batch with controlled concurrency."""
+                           start_index: int,
+                           end_index: int) -> None:
+        """Process job.items[start_index:end_index] with controlled concurrency."""
         async with self.batch_semaphore:
+            items = job.get_batch(start_index, end_index)
+            item_count = end_index - start_index
             batch_start_time = datetime.now()
             batch_success_count = 0
             batch_failure_count = 0
+            batch_errors: List[str] = []
             
             try:
                 # Process items in the batch
@@ -411,20 +487,22 @@ class BatchProcessor:
                     else:
                         batch_failure_count += 1
                         error_msg = result.get('error', 'Unknown error')
-                        job.error_messages.append(f"Item {start_index + i}: {error_msg}")
+                        batch_errors.append(f"Item {start_index + i}: {error_msg}")
             
             except Exception as e:
                 # Entire batch failed
-                batch_failure_count = len(items)
-                job.error_messages.append(f"Batch {batch_id} failed: {e}")
+                batch_failure_count = item_count
+                batch_errors.append(f"Batch {batch_id} failed: {e}")
             
-            # Update job counters atomically
-            job.processed_count += len(items)
-            job.success_count += batch_success_count
-            job.failure_count += batch_failure_count
+            # Update job counters atomically, once per batch
+            async with job._lock:
+                job.processed_count += item_count
+                job.success_count += batch_success_count
+                job.failure_count += batch_failure_count
+                job.error_messages.extend(batch_errors)
             
             batch_time = (datetime.now() - batch_start_time).total_seconds()
-            logger.debug(f"Processed batch {batch_id}: {batch_success_count}/{len(items)} successful in {batch_time:.2f}s")
+            logger.debug(f"Processed batch {batch_id}: {batch_success_count}/{item_count} successful in {batch_time:.2f}s")
     
     async def _calculate_optimal_batch_size(self, job: BatchJob) -> int:
         """Calculate optimal batch size based on job characteristics and system performance."""
@@ -470,8 +548,8 @@ class BatchProcessor:
         self.performance_metrics["total_jobs_processed"] += 1
         self.performance_metrics["total_items_processed"] += job.processed_count
         
-        if job.execution_time:
-            execution_seconds = job.execution_time.total_seconds()
+        execution_seconds = job.execution_seconds
+        if execution_seconds is not None:
             self.performance_metrics["total_processing_time"] += execution_seconds
             
             # Update averages
@@ -505,6 +583,23 @@ class BatchProcessor:
             )
 
 
+def _to_columns(items: List[Dict[str, Any]], defaults: Dict[str, Any]) -> Dict[str, List[Any]]:
+    """
+    Convert a list of item dicts into columns, filling missing fields once.
+    
+    Args:
+        items: Item dictionaries as submitted by the caller
+        defaults: Field name to default value for every column to build
+    
+    Returns:
+        Mapping of field name to a list of values aligned with items
+    """
+    return {
+        field: [item.get(field, default) for item in items]
+        for field, default in defaults.items()
+    }
+
+
 class BatchService:
     """
     High-level batch processing service with pre-built operations for TMWS entities.
@@ -528,22 +623,20 @@ class BatchService:
                                   batch_size: int = 100) -> str:
         """Batch create memories with optimized processing."""
         
-        async def memory_processor(items: List[Dict[str, Any]], metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
+        async def memory_processor(columns: Dict[str, List[Any]], metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
             results = []
+            fields = list(columns)
             
             async with get_async_session() as session:
-                for item in items:
+                for values in zip(*columns.values()):
                     try:
-                        memory = Memory(
-                            content=item['content'],
-                            agent_id=item.get('agent_id', agent_id),
-                            namespace=item.get('namespace', namespace),
-                            importance=item.get('importance', 0.5),
-                            memory_type=item.get('memory_type', 'episodic'),
-                            access_level=item.get('access_level', 'private'),
-                            context_tags=item.get('context_tags', []),
-                            learning_weight=item.get('learning_weight', 1.0)
-                        )
+                        memory_fields = dict(zip(fields, values))
+                        if memory_fields['content'] is None:
+                            raise ValidationError("Memory content is required")
+                        if memory_fields['context_tags'] is None:
+                            memory_fields['context_tags'] = []
+                        
+                        memory = Memory(**memory_fields)
                         
                         session.add(memory)
                         results.append({'success': True, 'memory_id': None})  # Will be set after flush
@@ -567,15 +660,33 @@ class BatchService:
                             result['success'] = False
                             result['error'] = f"Batch commit failed: {e}"
             
+            # Cached searches may be missing the new memories
+            if any(result['success'] for result in results):
+                get_query_cache().invalidate()
+            
             return results
         
+        # Build columns once at submit time; defaults are resolved here
+        # rather than per item inside every batch
+        columns = _to_columns(memories_data, {
+            'content': None,
+            'agent_id': agent_id,
+            'namespace': namespace,
+            'importance': 0.5,
+            'memory_type': 'episodic',
+            'access_level': 'private',
+            'context_tags': None,
+            'learning_weight': 1.0
+        })
+        
         job = BatchJob(
             job_id=f"batch_memories_{uuid4().hex[:8]}",
             operation_type=BatchOperationType.CREATE,
             items=memories_data,
             processor_func=memory_processor,
             batch_size=batch_size,
-            metadata={'agent_id': agent_id, 'namespace': namespace}
+            metadata={'agent_id': agent_id, 'namespace': namespace},
+            columns=columns
         )
         
         return await self.processor.submit_job(job)
@@ -678,6 +789,10 @@ class BatchService:
                 except Exception as e:
                     results.append({'success': False, 'error': str(e)})
             
+            # Cached searches may include the deleted memories
+            if memory_ids:
+                get_query_cache().invalidate()
+            
             return results
         
         # Create dummy items for batch processing (actual work is done in processor)
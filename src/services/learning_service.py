@@ -4,23 +4,87 @@ Implements comprehensive learning pattern management with optimization.
 """
 
 import asyncio
+import hashlib
+import heapq
+import json
 import logging
+import re
+import time
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple, Union
+from itertools import count
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
 from uuid import UUID
 
 import numpy as np
-from sqlalchemy import and_, desc, func, or_, select, text, update, delete
+import redis.asyncio as redis
+from sqlalchemy import (
+    String, and_, case, cast, delete, desc, func, insert, literal, or_, select, text, tuple_, update
+)
+from sqlalchemy.dialects.postgresql import JSONPATH, aggregate_order_by, insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from ..core.config import get_settings
 from ..core.database_enhanced import get_sync_session, get_async_session, DatabaseTransaction
 from ..models.learning_pattern import LearningPattern, PatternUsageHistory
 from ..core.exceptions import ValidationError, NotFoundError, PermissionError
 from ..security.validators import validate_agent_id, sanitize_input
 
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# (operation, sorted keyword items); hashable and used directly as a dict key
+CacheKey = Tuple[str, Tuple[Tuple[str, Any], ...]]
+
+
+def _score_candidates_numpy(success_rates: np.ndarray,
+                            usage_counts: np.ndarray,
+                            confidence_scores: np.ndarray,
+                            history_boosts: np.ndarray,
+                            context_ranks: np.ndarray) -> np.ndarray:
+    """Compute recommendation relevance scores with vectorized NumPy."""
+    return (
+        success_rates * 0.4 +
+        np.minimum(usage_counts / 10.0, 1.0) * 0.3 +
+        confidence_scores * 0.3 +
+        history_boosts * 0.2 +
+        context_ranks * 0.2
+    )
+
+
+if NUMBA_AVAILABLE:
+    @numba.njit(cache=True)
+    def _score_candidates(success_rates, usage_counts, confidence_scores, history_boosts, context_ranks):
+        """Compute recommendation relevance scores in a single compiled pass."""
+        scores = np.empty(success_rates.shape[0])
+        for i in range(success_rates.shape[0]):
+            scores[i] = (
+                success_rates[i] * 0.4 +
+                min(usage_counts[i] / 10.0, 1.0) * 0.3 +
+                confidence_scores[i] * 0.3 +
+                history_boosts[i] * 0.2 +
+                context_ranks[i] * 0.2
+            )
+        return scores
+else:
+    _score_candidates = _score_candidates_numpy
+
+
+def _string_search_jsonpath(query_text: str) -> str:
+    """
+    Build a jsonpath matching top-level string values containing query_text.
+    
+    The text is matched literally (case-insensitive) and escaped for the
+    jsonpath string literal, so the path can be sent as a bound parameter.
+    """
+    pattern = re.escape(query_text).replace('\\', '\\\\').replace('"', '\\"')
+    return f'$.* ? (@.type() == "string" && @ like_regex "{pattern}" flag "i")'
+
 
 class LearningService:
     """
@@ -34,42 +98,300 @@ class LearningService:
     - Learning pattern evolution and versioning
     """
     
+    # Per-operation TTLs in seconds; derived analytics tolerate more
+    # staleness than searches, which pattern mutations affect directly
+    CACHE_TTLS = {
+        "get_patterns_by_agent": 300,
+        "search_patterns": 60,
+        "get_pattern_analytics": 900,
+    }
+    
+    # Rows per bulk INSERT, keeping well under asyncpg's bind parameter limit
+    BULK_INSERT_CHUNK_SIZE = 1000
+    
+    # Rows fetched per round-trip when streaming unbounded result sets
+    STREAM_CHUNK_SIZE = 200
+    
+    # Seconds between write-behind flushes of buffered pattern usage
+    USAGE_FLUSH_INTERVAL = 0.1
+    
+    # Prefix for entries in the shared (Redis) L2 cache
+    SHARED_CACHE_PREFIX = "tmws:learning"
+    
+    # Pub/sub channel carrying invalidated cache tags between workers
+    INVALIDATION_CHANNEL = "tmws:learning:invalidations"
+    
+    # Unlinks every shared entry registered under the given tag sets
+    _INVALIDATE_SHARED_SCRIPT = """
+    for _, tag_key in ipairs(KEYS) do
+        local keys = redis.call('SMEMBERS', tag_key)
+        for i = 1, #keys, 500 do
+            redis.call('UNLINK', unpack(keys, i, math.min(i + 499, #keys)))
+        end
+        redis.call('DEL', tag_key)
+    end
+    """
+    
     def __init__(self):
-        self._cache = {}
-        self._cache_ttl = 300  # 5 minutes
-        self._last_cache_cleanup = datetime.now()
-    
-    def _cleanup_cache(self) -> None:
-        """Clean up expired cache entries."""
-        now = datetime.now()
-        if (now - self._last_cache_cleanup).seconds > 60:  # Cleanup every minute
-            expired_keys = [
-                key for key, (data, timestamp) in self._cache.items()
-                if (now - timestamp).seconds > self._cache_ttl
-            ]
-            for key in expired_keys:
-                del self._cache[key]
-            self._last_cache_cleanup = now
-    
-    def _cache_key(self, operation: str, **kwargs) -> str:
-        """Generate cache key for operation."""
-        key_parts = [operation]
-        for k, v in sorted(kwargs.items()):
-            key_parts.append(f"{k}:{v}")
-        return ":".join(key_parts)
-    
-    def _get_cached(self, key: str) -> Optional[Any]:
+        # key -> [data, expires_at (time.monotonic()), hits, tags, seq, priority]
+        self._cache: Dict[CacheKey, List[Any]] = {}
+        # Lazy min-heaps over the entries; items left behind by hits, drops
+        # and overwrites are skipped when popped (their seq/priority no
+        # longer match the live entry)
+        self._cache_expiry_heap: List[Tuple[float, int, CacheKey]] = []
+        # (priority, seq, key); priority is hits plus the cache age below
+        self._cache_lfu_heap: List[Tuple[float, int, CacheKey]] = []
+        # LFU with dynamic aging: the priority of the last evicted entry.
+        # New entries start at this age rather than at zero hits, so they
+        # aren't the next victim behind entries that were hot long ago
+        self._cache_age = 0.0
+        self._cache_seq = count()
+        # tag -> keys, so mutations invalidate only the results they affect
+        self._cache_tags: Dict[str, Set[CacheKey]] = {}
+        self._cache_ttl = 300  # Default TTL, 5 minutes
+        self._cache_max_size = 2048
+        self._cache_stats = {
+            "hits": 0, "misses": 0, "evictions": 0, "invalidations": 0,
+            "shared_hits": 0, "shared_misses": 0
+        }
+        
+        # Write-behind buffer for record_usage: (pattern_id, agent_id) -> totals
+        self._pending_usage: Dict[Tuple[UUID, Optional[str]], Dict[str, Any]] = {}
+        self._usage_flush_lock = asyncio.Lock()
+        self._usage_flush_task: Optional[asyncio.Task] = None
+        
+        # Shared L2 cache for JSON-serializable results, created on first use
+        self._redis: Optional[redis.Redis] = None
+        self._redis_disabled = False
+        self._invalidation_task: Optional[asyncio.Task] = None
+    
+    def _evict(self, now: float, keep_key: CacheKey) -> None:
+        """Evict expired entries, then the least frequently used ones, down to capacity."""
+        expiry_heap = self._cache_expiry_heap
+        while expiry_heap and expiry_heap[0][0] <= now:
+            _, seq, key = heapq.heappop(expiry_heap)
+            entry = self._cache.get(key)
+            if entry is not None and entry[4] == seq:
+                self._drop(key)
+                self._cache_stats["evictions"] += 1
+        
+        lfu_heap = self._cache_lfu_heap
+        skipped = []
+        while len(self._cache) > self._cache_max_size and lfu_heap:
+            item = heapq.heappop(lfu_heap)
+            priority, seq, key = item
+            entry = self._cache.get(key)
+            if entry is None or entry[4] != seq or entry[5] != priority:
+                continue
+            if key == keep_key:
+                # Never evict the entry that was just inserted
+                skipped.append(item)
+                continue
+            self._cache_age = max(self._cache_age, priority)
+            self._drop(key)
+            self._cache_stats["evictions"] += 1
+        for item in skipped:
+            heapq.heappush(lfu_heap, item)
+    
+    def _compact_cache_heaps(self) -> None:
+        """Rebuild the eviction heaps once stale items outnumber live entries."""
+        limit = 2 * len(self._cache) + 64
+        if len(self._cache_lfu_heap) > limit:
+            self._cache_lfu_heap = [(entry[5], entry[4], key) for key, entry in self._cache.items()]
+            heapq.heapify(self._cache_lfu_heap)
+        if len(self._cache_expiry_heap) > limit:
+            self._cache_expiry_heap = [(entry[1], entry[4], key) for key, entry in self._cache.items()]
+            heapq.heapify(self._cache_expiry_heap)
+    
+    def _cache_key(self, operation: str, **kwargs) -> CacheKey:
+        """Generate a hashable cache key for operation (no string building)."""
+        return (operation, tuple(sorted(kwargs.items())))
+    
+    def _get_cached(self, key: CacheKey) -> Optional[Any]:
         """Get cached value if not expired."""
-        self._cleanup_cache()
+        entry = self._cache.get(key)
+        if entry is None:
+            self._cache_stats["misses"] += 1
+            return None
+        
+        if time.monotonic() >= entry[1]:
+            self._drop(key)
+            self._cache_stats["misses"] += 1
+            return None
+        
+        entry[2] += 1
+        entry[5] += 1
+        heapq.heappush(self._cache_lfu_heap, (entry[5], entry[4], key))
+        self._compact_cache_heaps()
+        self._cache_stats["hits"] += 1
+        return entry[0]
+    
+    def _set_cache(self,
+                   key: CacheKey,
+                   data: Any,
+                   ttl: Optional[int] = None,
+                   tags: Tuple[str, ...] = ()) -> None:
+        """Set cached value with an expiry, bounded to _cache_max_size entries."""
         if key in self._cache:
-            data, timestamp = self._cache[key]
-            if (datetime.now() - timestamp).seconds < self._cache_ttl:
-                return data
-        return None
+            self._drop(key)
+        
+        now = time.monotonic()
+        expires_at = now + (ttl if ttl is not None else self._cache_ttl)
+        seq = next(self._cache_seq)
+        self._cache[key] = [data, expires_at, 0, tags, seq, self._cache_age]
+        heapq.heappush(self._cache_expiry_heap, (expires_at, seq, key))
+        heapq.heappush(self._cache_lfu_heap, (self._cache_age, seq, key))
+        for tag in tags:
+            self._cache_tags.setdefault(tag, set()).add(key)
+        
+        if len(self._cache) > self._cache_max_size:
+            self._evict(now, keep_key=key)
+        self._compact_cache_heaps()
+    
+    def _drop(self, key: CacheKey) -> None:
+        """Remove a cache entry and its tag index references."""
+        entry = self._cache.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[3]:
+            keys = self._cache_tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._cache_tags[tag]
+    
+    def _invalidate_local(self, tags: Iterable[str]) -> None:
+        """Drop every in-process entry registered under any of tags."""
+        for tag in tags:
+            keys = self._cache_tags.pop(tag, None)
+            if not keys:
+                continue
+            for key in keys:
+                self._drop(key)
+            self._cache_stats["invalidations"] += len(keys)
+    
+    async def _invalidate(self, *tags: str) -> None:
+        """
+        Invalidate cached results affected by a mutation.
+        
+        The local cache is cleared immediately; with Redis configured, the
+        shared entries are unlinked and other workers are told to drop
+        theirs. TTLs only bound staleness if that broadcast is lost.
+        """
+        self._invalidate_local(tags)
+        
+        client = self._get_redis()
+        if client is None:
+            return
+        
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.eval(
+                    self._INVALIDATE_SHARED_SCRIPT,
+                    len(tags),
+                    *(self._shared_tag_key(tag) for tag in tags)
+                )
+                pipe.publish(self.INVALIDATION_CHANNEL, json.dumps(tags))
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Shared pattern cache invalidation failed: {e}")
+    
+    async def _invalidation_listener(self, client: redis.Redis) -> None:
+        """Apply cache invalidations published by other workers."""
+        try:
+            async with client.pubsub() as pubsub:
+                await pubsub.subscribe(self.INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._invalidate_local(json.loads(message["data"]))
+        except Exception as e:
+            # Without the listener, other workers' mutations expire by TTL only
+            logger.warning(f"Cache invalidation listener stopped: {e}")
+    
+    @staticmethod
+    def _pattern_tags(agent_id: Optional[str]) -> Tuple[str, ...]:
+        """Cache tags affected by creating, changing or deleting an agent's pattern."""
+        return (f"agent:{agent_id}", "search", "analytics")
+    
+    def _get_redis(self) -> Optional[redis.Redis]:
+        """Get the shared cache client, or None when Redis is not configured."""
+        if self._redis is None and not self._redis_disabled:
+            redis_url = get_settings().redis_url
+            if not redis_url:
+                self._redis_disabled = True
+                return None
+            try:
+                self._redis = redis.Redis.from_url(
+                    redis_url,
+                    decode_responses=True,
+                    socket_connect_timeout=5,
+                    socket_timeout=5,
+                    retry_on_timeout=True,
+                    health_check_interval=30
+                )
+            except Exception as e:
+                logger.warning(f"Shared pattern cache disabled, failed to connect to Redis: {e}")
+                self._redis_disabled = True
+        return self._redis
+    
+    def _shared_cache_key(self, key: CacheKey) -> str:
+        """Map an L1 cache key to a stable Redis key."""
+        digest = hashlib.sha1(repr(key[1]).encode()).hexdigest()
+        return f"{self.SHARED_CACHE_PREFIX}:{key[0]}:{digest}"
     
-    def _set_cache(self, key: str, data: Any) -> None:
-        """Set cached value with timestamp."""
-        self._cache[key] = (data, datetime.now())
+    def _shared_tag_key(self, tag: str) -> str:
+        """Redis set holding the shared entries registered under tag."""
+        return f"{self.SHARED_CACHE_PREFIX}:tag:{tag}"
+    
+    async def _get_shared_cached(self, key: CacheKey) -> Optional[Any]:
+        """Get a value from the shared L2 cache; errors are treated as misses."""
+        client = self._get_redis()
+        if client is None:
+            return None
+        
+        try:
+            payload = await client.get(self._shared_cache_key(key))
+        except Exception as e:
+            logger.warning(f"Shared pattern cache read failed: {e}")
+            return None
+        
+        if payload is None:
+            self._cache_stats["shared_misses"] += 1
+            return None
+        
+        self._cache_stats["shared_hits"] += 1
+        return json.loads(payload)
+    
+    async def _set_shared_cache(self,
+                                key: CacheKey,
+                                data: Any,
+                                ttl: int,
+                                tags: Tuple[str, ...] = ()) -> None:
+        """Store a JSON-serializable value in the shared L2 cache."""
+        client = self._get_redis()
+        if client is None:
+            return
+        
+        shared_key = self._shared_cache_key(key)
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.set(shared_key, json.dumps(data, default=str), ex=ttl)
+                for tag in tags:
+                    pipe.sadd(self._shared_tag_key(tag), shared_key)
+                    pipe.expire(self._shared_tag_key(tag), ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Shared pattern cache write failed: {e}")
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get pattern cache statistics."""
+        lookups = self._cache_stats["hits"] + self._cache_stats["misses"]
+        return {
+            **self._cache_stats,
+            "size": len(self._cache),
+            "max_size": self._cache_max_size,
+            "hit_rate": self._cache_stats["hits"] / lookups if lookups else 0.0
+        }
     
     async def create_pattern(self,
                            pattern_name: str,
@@ -127,22 +449,23 @@ class LearningService:
         
         # Create pattern
         async with get_async_session() as session:
-            # Check for existing pattern
-            existing = await session.execute(
-                select(LearningPattern).where(
-                    and_(
-                        LearningPattern.pattern_name == pattern_name,
-                        LearningPattern.namespace == namespace,
-                        LearningPattern.agent_id == agent_id
-                    )
+            if agent_id is None:
+                # NULLs are distinct in the unique constraint, so system
+                # patterns still need an explicit existence check
+                existing = await session.execute(
+                    select(LearningPattern.id).where(
+                        and_(
+                            LearningPattern.pattern_name == pattern_name,
+                            LearningPattern.namespace == namespace,
+                            LearningPattern.agent_id.is_(None)
+                        )
+                    ).limit(1)
                 )
-            )
-            
-            if existing.scalar_one_or_none():
-                raise ValidationError("Pattern with this name already exists in namespace")
+                if existing.first() is not None:
+                    raise ValidationError("Pattern with this name already exists in namespace")
             
-            # Create new pattern
-            pattern = LearningPattern(
+            # Insert and detect duplicates atomically in one round-trip
+            stmt = pg_insert(LearningPattern).values(
                 pattern_name=pattern_name,
                 agent_id=agent_id,
                 namespace=namespace,
@@ -152,14 +475,19 @@ class LearningService:
                 pattern_data=pattern_data,
                 learning_weight=learning_weight,
                 complexity_score=complexity_score
-            )
-            
-            session.add(pattern)
-            await session.flush()
-            await session.refresh(pattern)
+            ).on_conflict_do_nothing(
+                constraint="uq_learning_patterns_name_namespace_agent"
+            ).returning(LearningPattern)
             
-            logger.info(f"Created learning pattern: {pattern_name} for agent: {agent_id}")
-            return pattern
+            pattern = (await session.scalars(stmt)).one_or_none()
+            if pattern is None:
+                raise ValidationError("Pattern with this name already exists in namespace")
+        
+        # Invalidate once committed so readers cannot re-cache the old state
+        await self._invalidate(*self._pattern_tags(agent_id))
+        
+        logger.info(f"Created learning pattern: {pattern_name} for agent: {agent_id}")
+        return pattern
     
     async def get_pattern(self,
                          pattern_id: UUID,
@@ -178,18 +506,27 @@ class LearningService:
             PermissionError: If access denied
         """
         async with get_async_session(readonly=True) as session:
+            # Access is checked in SQL so denied rows never leave the database
             result = await session.execute(
-                select(LearningPattern).where(LearningPattern.id == pattern_id)
+                select(LearningPattern).where(
+                    and_(
+                        LearningPattern.id == pattern_id,
+                        LearningPattern.access_filter(requesting_agent_id)
+                    )
+                )
             )
             pattern = result.scalar_one_or_none()
             
-            if not pattern:
-                return None
+            if pattern:
+                return pattern
             
-            if not pattern.can_access(requesting_agent_id):
-                raise PermissionError("Access denied to this learning pattern")
+            exists = await session.scalar(
+                select(LearningPattern.id).where(LearningPattern.id == pattern_id)
+            )
+            if not exists:
+                return None
             
-            return pattern
+            raise PermissionError("Access denied to this learning pattern")
     
     async def get_patterns_by_agent(self,
                                   agent_id: str,
@@ -223,7 +560,7 @@ class LearningService:
         )
         
         cached = self._get_cached(cache_key)
-        if cached:
+        if cached is not None:
             return cached
         
         async with get_async_session(readonly=True) as session:
@@ -241,7 +578,12 @@ class LearningService:
             result = await session.execute(query)
             patterns = result.scalars().all()
             
-            self._set_cache(cache_key, patterns)
+            self._set_cache(
+                cache_key,
+                patterns,
+                ttl=self.CACHE_TTLS["get_patterns_by_agent"],
+                tags=(f"agent:{agent_id}",)
+            )
             return patterns
     
     async def search_patterns(self,
@@ -279,7 +621,7 @@ class LearningService:
             category=category,
             subcategory=subcategory,
             namespace=namespace,
-            access_levels=",".join(access_levels or []),
+            access_levels=tuple(access_levels or ()),
             requesting_agent_id=requesting_agent_id,
             min_success_rate=min_success_rate,
             min_usage_count=min_usage_count,
@@ -288,7 +630,7 @@ class LearningService:
         )
         
         cached = self._get_cached(cache_key)
-        if cached:
+        if cached is not None:
             return cached
         
         async with get_async_session(readonly=True) as session:
@@ -296,25 +638,7 @@ class LearningService:
             
             # Access control filter
             if requesting_agent_id:
-                access_filter = or_(
-                    LearningPattern.access_level == "public",
-                    LearningPattern.access_level == "system",
-                    and_(
-                        LearningPattern.access_level == "private",
-                        LearningPattern.agent_id == requesting_agent_id
-                    ),
-                    and_(
-                        LearningPattern.access_level == "shared",
-                        or_(
-                            LearningPattern.agent_id == requesting_agent_id,
-                            func.jsonb_exists_any(
-                                LearningPattern.shared_with_agents, 
-                                text(f"ARRAY['{requesting_agent_id}']")
-                            )
-                        )
-                    )
-                )
-                query = query.where(access_filter)
+                query = query.where(LearningPattern.access_filter(requesting_agent_id))
             else:
                 # No agent specified, only public and system patterns
                 query = query.where(
@@ -324,13 +648,13 @@ class LearningService:
                     )
                 )
             
-            # Text search
+            # Text search (the pattern_name ILIKE is served by the trigram index)
             if query_text:
                 search_filter = or_(
                     LearningPattern.pattern_name.ilike(f"%{query_text}%"),
                     func.jsonb_path_exists(
                         LearningPattern.pattern_data,
-                        text(f"'$.*?(@.type() == \"string\" && @ like_regex \"{query_text}\" flag \"i\")'")
+                        cast(literal(_string_search_jsonpath(query_text), String), JSONPATH)
                     )
                 )
                 query = query.where(search_filter)
@@ -353,21 +677,221 @@ class LearningService:
             if min_usage_count > 0:
                 query = query.where(LearningPattern.usage_count >= min_usage_count)
             
-            # Order by relevance (usage count * success rate * confidence score)
+            # Order by the indexed generated relevance column
+            # (usage count * success rate * confidence score)
             query = query.order_by(
-                desc(
-                    LearningPattern.usage_count * 
-                    LearningPattern.success_rate * 
-                    LearningPattern.confidence_score
-                )
+                desc(LearningPattern.relevance_score)
             ).limit(limit).offset(offset)
             
             result = await session.execute(query)
             patterns = result.scalars().all()
             
-            self._set_cache(cache_key, patterns)
+            self._set_cache(cache_key, patterns, ttl=self.CACHE_TTLS["search_patterns"], tags=("search",))
             return patterns
     
+    @staticmethod
+    def _usage_update_values(using_agent_id: Optional[str],
+                             uses: int,
+                             outcomes: int,
+                             successes: float,
+                             execution_time: Optional[float]) -> Dict[str, Any]:
+        """
+        Build UPDATE SET expressions recording `uses` usages of a pattern.
+        
+        Every expression reads the pre-update row, so the statement is atomic.
+        For a single usage this mirrors LearningPattern.increment_usage and
+        update_success_rate; `outcomes` is how many usages reported success
+        or failure and `successes` how many of those succeeded.
+        """
+        by_owner = LearningPattern.agent_id.is_not_distinct_from(using_agent_id)
+        
+        values: Dict[str, Any] = {
+            "usage_count": LearningPattern.usage_count + uses,
+            "last_used_at": func.now(),
+            "agent_usage_count": case(
+                (by_owner, LearningPattern.agent_usage_count + uses),
+                else_=LearningPattern.agent_usage_count
+            ),
+            "last_agent_used_at": case(
+                (by_owner, func.now()),
+                else_=LearningPattern.last_agent_used_at
+            )
+        }
+        
+        if execution_time is not None:
+            # Exponential moving average
+            values["avg_execution_time"] = func.coalesce(
+                0.9 * LearningPattern.avg_execution_time + 0.1 * execution_time,
+                execution_time
+            )
+        
+        if outcomes:
+            new_success_rate = (
+                (LearningPattern.success_rate * LearningPattern.usage_count + successes) /
+                (LearningPattern.usage_count + uses)
+            )
+            values["success_rate"] = new_success_rate
+            values["agent_success_rate"] = case(
+                (
+                    by_owner,
+                    (LearningPattern.agent_success_rate * LearningPattern.agent_usage_count + successes) /
+                    (LearningPattern.agent_usage_count + uses)
+                ),
+                else_=LearningPattern.agent_success_rate
+            )
+            values["confidence_score"] = (
+                0.3 + 0.7 * func.least(1.0, (LearningPattern.usage_count + uses) / 10.0) * new_success_rate
+            )
+        
+        return values
+    
+    def record_usage(self,
+                     pattern_id: UUID,
+                     using_agent_id: Optional[str] = None,
+                     execution_time: Optional[float] = None,
+                     success: Optional[bool] = None,
+                     context_data: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Buffer a pattern usage to be written by the background flush.
+        
+        Unlike use_pattern this does not touch the database or return the
+        updated pattern; usages are coalesced per (pattern, agent) and
+        written every USAGE_FLUSH_INTERVAL seconds (or on flush_usage()).
+        Usages the agent may not access are dropped at flush time.
+        """
+        pending = self._pending_usage.get((pattern_id, using_agent_id))
+        if pending is None:
+            pending = {"uses": 0, "outcomes": 0, "successes": 0.0, "execution_times": [], "history": []}
+            self._pending_usage[(pattern_id, using_agent_id)] = pending
+        
+        pending["uses"] += 1
+        if success is not None:
+            pending["outcomes"] += 1
+            pending["successes"] += 1.0 if success else 0.0
+        if execution_time is not None:
+            pending["execution_times"].append(execution_time)
+        pending["history"].append({
+            "pattern_id": pattern_id,
+            "agent_id": using_agent_id,
+            "execution_time": execution_time,
+            "success": success,
+            "context_data": context_data
+        })
+    
+    async def flush_usage(self) -> int:
+        """
+        Write buffered usages with one UPDATE per (pattern, agent) and one bulk history INSERT.
+        
+        Returns:
+            Number of usages written
+        """
+        async with self._usage_flush_lock:
+            if not self._pending_usage:
+                return 0
+            # Swap the buffer; record_usage keeps appending to the new one
+            pending_usage, self._pending_usage = self._pending_usage, {}
+            
+            history_rows: List[Dict[str, Any]] = []
+            try:
+                async with get_async_session() as session:
+                    for (pattern_id, using_agent_id), pending in pending_usage.items():
+                        execution_times = pending["execution_times"]
+                        values = self._usage_update_values(
+                            using_agent_id,
+                            uses=pending["uses"],
+                            outcomes=pending["outcomes"],
+                            successes=pending["successes"],
+                            execution_time=sum(execution_times) / len(execution_times) if execution_times else None
+                        )
+                        updated = await session.scalar(
+                            update(LearningPattern)
+                            .where(and_(
+                                LearningPattern.id == pattern_id,
+                                LearningPattern.access_filter(using_agent_id)
+                            ))
+                            .values(**values)
+                            .returning(LearningPattern.id)
+                            .execution_options(synchronize_session=False)
+                        )
+                        if updated is None:
+                            logger.warning(
+                                f"Dropped {pending['uses']} buffered usages of pattern {pattern_id} "
+                                f"by agent {using_agent_id}: not found or access denied"
+                            )
+                            continue
+                        history_rows.extend(pending["history"])
+                
+                    if history_rows:
+                        await session.execute(insert(PatternUsageHistory), history_rows)
+            except BaseException:
+                # Nothing was committed; put the usages back for the next flush
+                self._restore_pending_usage(pending_usage)
+                raise
+            
+            if history_rows:
+                await self._invalidate("analytics")
+            
+            return len(history_rows)
+    
+    def _restore_pending_usage(self, pending_usage: Dict[Tuple[UUID, Optional[str]], Dict[str, Any]]) -> None:
+        """Merge usages from a failed flush back into the write-behind buffer."""
+        for key, pending in pending_usage.items():
+            current = self._pending_usage.get(key)
+            if current is None:
+                self._pending_usage[key] = pending
+                continue
+            for field in ("uses", "outcomes", "successes"):
+                current[field] += pending[field]
+            current["execution_times"].extend(pending["execution_times"])
+            current["history"].extend(pending["history"])
+    
+    async def _usage_flush_loop(self) -> None:
+        """Periodically flush buffered usages."""
+        while True:
+            await asyncio.sleep(self.USAGE_FLUSH_INTERVAL)
+            try:
+                await self.flush_usage()
+            except Exception as e:
+                logger.error(f"Failed to flush buffered pattern usage: {e}")
+    
+    async def start(self) -> None:
+        """Start the background usage flush and cache invalidation listener."""
+        if self._usage_flush_task:
+            logger.warning("Learning service usage flush already started")
+            return
+        self._usage_flush_task = asyncio.create_task(self._usage_flush_loop())
+        
+        client = self._get_redis()
+        if client is not None:
+            self._invalidation_task = asyncio.create_task(self._invalidation_listener(client))
+    
+    async def stop(self, timeout: float = 60.0) -> None:
+        """Stop background tasks and write any buffered usages."""
+        if self._usage_flush_task:
+            self._usage_flush_task.cancel()
+            try:
+                await asyncio.wait_for(self._usage_flush_task, timeout=5.0)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+            self._usage_flush_task = None
+        
+        try:
+            await asyncio.wait_for(self.flush_usage(), timeout=timeout)
+        except Exception as e:
+            logger.error(f"Failed to flush buffered pattern usage on stop: {e}")
+        
+        if self._invalidation_task:
+            self._invalidation_task.cancel()
+            try:
+                await self._invalidation_task
+            except asyncio.CancelledError:
+                pass
+            self._invalidation_task = None
+        
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+    
     async def use_pattern(self,
                          pattern_id: UUID,
                          using_agent_id: Optional[str] = None,
@@ -391,41 +915,50 @@ class LearningService:
             NotFoundError: If pattern not found
             PermissionError: If access denied
         """
+        # Usage is recorded with one atomic UPDATE ... RETURNING
+        values = self._usage_update_values(
+            using_agent_id,
+            uses=1,
+            outcomes=0 if success is None else 1,
+            successes=1.0 if success else 0.0,
+            execution_time=execution_time
+        )
+        
         async with get_async_session() as session:
-            # Get pattern with write lock
-            result = await session.execute(
-                select(LearningPattern).where(LearningPattern.id == pattern_id).with_for_update()
+            stmt = (
+                update(LearningPattern)
+                .where(and_(LearningPattern.id == pattern_id, LearningPattern.access_filter(using_agent_id)))
+                .values(**values)
+                .returning(LearningPattern)
+                .execution_options(synchronize_session=False)
             )
-            pattern = result.scalar_one_or_none()
+            pattern = (await session.scalars(stmt)).one_or_none()
             
             if not pattern:
-                raise NotFoundError("Learning pattern not found")
-            
-            if not pattern.can_access(using_agent_id):
+                # Only the failure path pays for telling the two cases apart
+                exists = await session.scalar(
+                    select(LearningPattern.id).where(LearningPattern.id == pattern_id)
+                )
+                if not exists:
+                    raise NotFoundError("Learning pattern not found")
                 raise PermissionError("Access denied to this learning pattern")
             
-            # Update pattern usage
-            by_owner = pattern.agent_id == using_agent_id
-            pattern.increment_usage(by_owner=by_owner, execution_time=execution_time)
-            
-            if success is not None:
-                pattern.update_success_rate(success, by_owner=by_owner)
-            
             # Record usage history
-            usage_record = PatternUsageHistory(
-                pattern_id=pattern_id,
-                agent_id=using_agent_id,
-                execution_time=execution_time,
-                success=success,
-                context_data=context_data
+            await session.execute(
+                insert(PatternUsageHistory).values(
+                    pattern_id=pattern_id,
+                    agent_id=using_agent_id,
+                    execution_time=execution_time,
+                    success=success,
+                    context_data=context_data
+                )
             )
-            session.add(usage_record)
-            
-            await session.flush()
-            await session.refresh(pattern)
-            
-            logger.info(f"Pattern {pattern.pattern_name} used by agent {using_agent_id}")
-            return pattern
+        
+        # Usage only moves the aggregates; listings and searches stay valid
+        await self._invalidate("analytics")
+        
+        logger.info(f"Pattern {pattern.pattern_name} used by agent {using_agent_id}")
+        return pattern
     
     async def update_pattern(self,
                            pattern_id: UUID,
@@ -455,46 +988,58 @@ class LearningService:
             PermissionError: If access denied
             ValidationError: If validation fails
         """
+        values: Dict[str, Any] = {}
+        if pattern_data is not None:
+            values["pattern_data"] = pattern_data
+        
+        if learning_weight is not None:
+            if not 0.0 <= learning_weight <= 10.0:
+                raise ValidationError("Learning weight must be between 0.0 and 10.0")
+            values["learning_weight"] = learning_weight
+        
+        if complexity_score is not None:
+            if not 0.0 <= complexity_score <= 1.0:
+                raise ValidationError("Complexity score must be between 0.0 and 1.0")
+            values["complexity_score"] = complexity_score
+        
+        if access_level is not None:
+            if access_level not in ["private", "shared", "public", "system"]:
+                raise ValidationError("Invalid access level")
+            values["access_level"] = access_level
+        
+        if shared_with_agents is not None:
+            values["shared_with_agents"] = shared_with_agents
+        
+        # Only owner can update pattern
+        owned = and_(LearningPattern.id == pattern_id, LearningPattern.agent_id == updating_agent_id)
+        
         async with get_async_session() as session:
-            result = await session.execute(
-                select(LearningPattern).where(LearningPattern.id == pattern_id).with_for_update()
-            )
-            pattern = result.scalar_one_or_none()
+            if values:
+                # The final row state comes back from the UPDATE itself
+                stmt = (
+                    update(LearningPattern)
+                    .where(owned)
+                    .values(**values)
+                    .returning(LearningPattern)
+                    .execution_options(synchronize_session=False)
+                )
+            else:
+                stmt = select(LearningPattern).where(owned)
+            pattern = (await session.scalars(stmt)).one_or_none()
             
             if not pattern:
-                raise NotFoundError("Learning pattern not found")
-            
-            # Only owner can update pattern
-            if pattern.agent_id != updating_agent_id:
+                exists = await session.scalar(
+                    select(LearningPattern.id).where(LearningPattern.id == pattern_id)
+                )
+                if not exists:
+                    raise NotFoundError("Learning pattern not found")
                 raise PermissionError("Only pattern owner can update")
-            
-            # Update fields
-            if pattern_data is not None:
-                pattern.pattern_data = pattern_data
-            
-            if learning_weight is not None:
-                if not 0.0 <= learning_weight <= 10.0:
-                    raise ValidationError("Learning weight must be between 0.0 and 10.0")
-                pattern.learning_weight = learning_weight
-            
-            if complexity_score is not None:
-                if not 0.0 <= complexity_score <= 1.0:
-                    raise ValidationError("Complexity score must be between 0.0 and 1.0")
-                pattern.complexity_score = complexity_score
-            
-            if access_level is not None:
-                if access_level not in ["private", "shared", "public", "system"]:
-                    raise ValidationError("Invalid access level")
-                pattern.access_level = access_level
-            
-            if shared_with_agents is not None:
-                pattern.shared_with_agents = shared_with_agents
-            
-            await session.flush()
-            await session.refresh(pattern)
-            
-            logger.info(f"Pattern {pattern.pattern_name} updated by agent {updating_agent_id}")
-            return pattern
+        
+        if values:
+            await self._invalidate(*self._pattern_tags(updating_agent_id))
+        
+        logger.info(f"Pattern {pattern.pattern_name} updated by agent {updating_agent_id}")
+        return pattern
     
     async def delete_pattern(self,
                            pattern_id: UUID,
@@ -527,9 +1072,11 @@ class LearningService:
                 raise PermissionError("Only pattern owner can delete")
             
             await session.delete(pattern)
-            
-            logger.info(f"Pattern {pattern.pattern_name} deleted by agent {deleting_agent_id}")
-            return True
+        
+        await self._invalidate(*self._pattern_tags(deleting_agent_id))
+        
+        logger.info(f"Pattern {pattern.pattern_name} deleted by agent {deleting_agent_id}")
+        return True
     
     async def get_pattern_analytics(self,
                                   agent_id: Optional[str] = None,
@@ -553,86 +1100,108 @@ class LearningService:
             days=days
         )
         
+        ttl = self.CACHE_TTLS["get_pattern_analytics"]
+        
         cached = self._get_cached(cache_key)
-        if cached:
+        if cached is not None:
+            return cached
+        
+        # Analytics are plain JSON, so other workers' results can be reused
+        cached = await self._get_shared_cached(cache_key)
+        if cached is not None:
+            self._set_cache(cache_key, cached, ttl=ttl, tags=("analytics",))
             return cached
         
         since_date = datetime.now() - timedelta(days=days)
         
+        # All sections are computed in a single round-trip: the filtered
+        # patterns are a CTE shared by every aggregate, and each section is
+        # returned as one JSON column
+        filtered = select(
+            LearningPattern.id,
+            LearningPattern.pattern_name,
+            LearningPattern.category,
+            LearningPattern.usage_count,
+            LearningPattern.success_rate,
+            LearningPattern.confidence_score
+        )
+        if agent_id:
+            filtered = filtered.where(LearningPattern.agent_id == agent_id)
+        if namespace:
+            filtered = filtered.where(LearningPattern.namespace == namespace)
+        filtered = filtered.cte("filtered")
+        
+        empty_json_array = text("'[]'::json")
+        
+        # Category distribution
+        categories = select(
+            filtered.c.category,
+            func.count().label('count')
+        ).group_by(filtered.c.category).subquery("categories")
+        
+        # Top patterns by usage
+        top = select(filtered).order_by(desc(filtered.c.usage_count)).limit(10).subquery("top")
+        
+        # Usage over time (recent usage)
+        usage_day = func.date_trunc('day', PatternUsageHistory.used_at)
+        usage = select(
+            usage_day.label('day'),
+            func.count().label('usage_count')
+        ).where(
+            PatternUsageHistory.used_at >= since_date
+        ).group_by(usage_day).subquery("usage")
+        
+        query = select(
+            select(func.count()).select_from(filtered).scalar_subquery().label("total_patterns"),
+            select(func.coalesce(
+                func.json_agg(func.json_build_object(
+                    'category', categories.c.category,
+                    'count', categories.c.count
+                )),
+                empty_json_array
+            )).scalar_subquery().label("category_distribution"),
+            select(func.coalesce(
+                func.json_agg(aggregate_order_by(
+                    func.json_build_object(
+                        'id', top.c.id,
+                        'name', top.c.pattern_name,
+                        'usage_count', top.c.usage_count,
+                        'success_rate', top.c.success_rate,
+                        'confidence_score', top.c.confidence_score
+                    ),
+                    desc(top.c.usage_count)
+                )),
+                empty_json_array
+            )).scalar_subquery().label("top_patterns"),
+            select(func.coalesce(
+                func.json_agg(aggregate_order_by(
+                    func.json_build_object('day', usage.c.day, 'usage_count', usage.c.usage_count),
+                    usage.c.day
+                )),
+                empty_json_array
+            )).scalar_subquery().label("recent_usage"),
+            select(func.json_build_object(
+                'avg_success_rate', func.avg(filtered.c.success_rate),
+                'stddev_success_rate', func.stddev(filtered.c.success_rate),
+                'min_success_rate', func.min(filtered.c.success_rate),
+                'max_success_rate', func.max(filtered.c.success_rate)
+            )).scalar_subquery().label("success_statistics")
+        )
+        
         async with get_async_session(readonly=True) as session:
-            # Base query
-            base_query = select(LearningPattern)
-            
-            if agent_id:
-                base_query = base_query.where(LearningPattern.agent_id == agent_id)
-            if namespace:
-                base_query = base_query.where(LearningPattern.namespace == namespace)
-            
-            # Total patterns
-            total_patterns = await session.scalar(
-                select(func.count()).select_from(base_query.subquery())
-            )
-            
-            # Category distribution
-            category_dist = await session.execute(
-                select(
-                    LearningPattern.category,
-                    func.count().label('count')
-                ).group_by(LearningPattern.category)
-            )
-            
-            # Top patterns by usage
-            top_patterns = await session.execute(
-                base_query.order_by(desc(LearningPattern.usage_count)).limit(10)
-            )
-            
-            # Usage over time (recent usage)
-            recent_usage = await session.execute(
-                select(
-                    func.date_trunc('day', PatternUsageHistory.used_at).label('day'),
-                    func.count().label('usage_count')
-                ).where(
-                    PatternUsageHistory.used_at >= since_date
-                ).group_by(
-                    func.date_trunc('day', PatternUsageHistory.used_at)
-                ).order_by('day')
-            )
-            
-            # Success rate statistics
-            success_stats = await session.execute(
-                select(
-                    func.avg(LearningPattern.success_rate).label('avg_success_rate'),
-                    func.stddev(LearningPattern.success_rate).label('stddev_success_rate'),
-                    func.min(LearningPattern.success_rate).label('min_success_rate'),
-                    func.max(LearningPattern.success_rate).label('max_success_rate')
-                ).select_from(base_query.subquery())
-            )
+            row = (await session.execute(query)).one()
             
             analytics = {
-                "total_patterns": total_patterns or 0,
-                "category_distribution": [
-                    {"category": row.category, "count": row.count}
-                    for row in category_dist
-                ],
-                "top_patterns": [
-                    {
-                        "id": str(pattern.id),
-                        "name": pattern.pattern_name,
-                        "usage_count": pattern.usage_count,
-                        "success_rate": pattern.success_rate,
-                        "confidence_score": pattern.confidence_score
-                    }
-                    for pattern in top_patterns.scalars().all()
-                ],
-                "recent_usage": [
-                    {"day": row.day.isoformat(), "usage_count": row.usage_count}
-                    for row in recent_usage
-                ],
-                "success_statistics": dict(success_stats.first()._asdict()) if success_stats.first() else {}
+                "total_patterns": row.total_patterns or 0,
+                "category_distribution": row.category_distribution,
+                "top_patterns": row.top_patterns,
+                "recent_usage": row.recent_usage,
+                "success_statistics": row.success_statistics or {}
             }
             
-            self._set_cache(cache_key, analytics)
-            return analytics
+        self._set_cache(cache_key, analytics, ttl=ttl, tags=("analytics",))
+        await self._set_shared_cache(cache_key, analytics, ttl, tags=("analytics",))
+        return analytics
     
     async def recommend_patterns(self,
                                agent_id: str,
@@ -651,81 +1220,130 @@ class LearningService:
         Returns:
             List of tuples (pattern, relevance_score)
         """
-        async with get_async_session(readonly=True) as session:
-            # Get agent's usage history
-            agent_history = await session.execute(
-                select(
-                    PatternUsageHistory.pattern_id,
-                    func.count().label('usage_count'),
-                    func.avg(func.coalesce(PatternUsageHistory.success, 0.5)).label('avg_success')
-                ).where(
-                    PatternUsageHistory.agent_id == agent_id
-                ).group_by(PatternUsageHistory.pattern_id)
-            )
-            
-            used_patterns = {
-                str(row.pattern_id): {
-                    'usage_count': row.usage_count,
-                    'avg_success': float(row.avg_success)
-                }
-                for row in agent_history
+        if limit <= 0:
+            return []
+        
+        # Agent's usage history
+        history_query = select(
+            PatternUsageHistory.pattern_id,
+            func.count().label('usage_count'),
+            func.avg(func.coalesce(PatternUsageHistory.success, 0.5)).label('avg_success')
+        ).where(
+            PatternUsageHistory.agent_id == agent_id
+        ).group_by(PatternUsageHistory.pattern_id)
+        
+        # Context relevance is ranked by Postgres against the indexed
+        # pattern_data_tsv; normalization 32 maps the rank into [0, 1)
+        context_rank = literal(0.0)
+        if context_data:
+            context_keywords = {
+                word
+                for value in context_data.values()
+                for word in str(value).lower().split()
             }
-            
-            # Get candidate patterns (not owned by agent, accessible)
-            query = select(LearningPattern).where(
-                and_(
-                    LearningPattern.agent_id != agent_id,
-                    or_(
-                        LearningPattern.access_level == "public",
-                        LearningPattern.access_level == "system",
-                        and_(
-                            LearningPattern.access_level == "shared",
-                            func.jsonb_exists_any(
-                                LearningPattern.shared_with_agents,
-                                text(f"ARRAY['{agent_id}']")
-                            )
-                        )
+            if context_keywords:
+                context_query = func.websearch_to_tsquery("simple", " or ".join(sorted(context_keywords)))
+                context_rank = func.ts_rank_cd(LearningPattern.pattern_data_tsv, context_query, 32)
+        
+        # Candidate score inputs (not owned by agent, accessible); full ORM
+        # rows are only loaded for the top-k afterwards
+        candidates_query = select(
+            LearningPattern.id,
+            LearningPattern.success_rate,
+            LearningPattern.usage_count,
+            LearningPattern.confidence_score,
+            context_rank.label("context_rank")
+        ).where(
+            and_(
+                LearningPattern.agent_id != agent_id,
+                or_(
+                    LearningPattern.access_level == "public",
+                    LearningPattern.access_level == "system",
+                    and_(
+                        LearningPattern.access_level == "shared",
+                        LearningPattern.shared_with_agents.contains([agent_id])
                     )
                 )
             )
+        )
+        
+        if category:
+            candidates_query = candidates_query.where(LearningPattern.category == category)
+        
+        async def fetch_history() -> Dict[UUID, float]:
+            async with get_async_session(readonly=True) as session:
+                result = await session.execute(history_query)
+                return {row.pattern_id: float(row.avg_success) for row in result}
+        
+        async def fetch_candidates() -> Tuple[List[UUID], np.ndarray]:
+            # Candidates are unbounded, so rows are streamed from a server-side
+            # cursor into per-chunk float columns; only ids and floats are
+            # kept, never the full result set
+            candidate_ids: List[UUID] = []
+            column_chunks: List[np.ndarray] = []
             
-            if category:
-                query = query.where(LearningPattern.category == category)
-            
-            candidates = await session.execute(query)
-            
-            recommendations = []
-            for pattern in candidates.scalars().all():
-                # Calculate relevance score
-                base_score = (
-                    pattern.success_rate * 0.4 +
-                    min(pattern.usage_count / 10.0, 1.0) * 0.3 +
-                    pattern.confidence_score * 0.3
+            async with get_async_session(readonly=True) as session:
+                result = await session.stream(
+                    candidates_query.execution_options(yield_per=self.STREAM_CHUNK_SIZE)
                 )
-                
-                # Boost score if similar patterns were used successfully
-                similarity_boost = 0.0
-                pattern_id_str = str(pattern.id)
-                
-                if pattern_id_str in used_patterns:
-                    history = used_patterns[pattern_id_str]
-                    similarity_boost = history['avg_success'] * 0.2
-                
-                # Context-based adjustments (simplified)
-                context_boost = 0.0
-                if context_data and pattern.pattern_data:
-                    # Simple keyword matching for context relevance
-                    context_keywords = set(str(context_data).lower().split())
-                    pattern_keywords = set(str(pattern.pattern_data).lower().split())
-                    overlap = len(context_keywords & pattern_keywords)
-                    context_boost = min(overlap / max(len(context_keywords), 1), 0.2)
-                
-                final_score = base_score + similarity_boost + context_boost
-                recommendations.append((pattern, final_score))
+                async for rows in result.partitions():
+                    candidate_ids.extend(row.id for row in rows)
+                    # Columns: success_rate, usage_count, confidence_score, context_rank
+                    column_chunks.append(np.array(
+                        [
+                            (row.success_rate, row.usage_count, row.confidence_score, row.context_rank or 0.0)
+                            for row in rows
+                        ],
+                        dtype=np.float64
+                    ))
             
-            # Sort by relevance score and limit results
-            recommendations.sort(key=lambda x: x[1], reverse=True)
-            return recommendations[:limit]
+            if not candidate_ids:
+                return candidate_ids, np.empty((0, 4))
+            return candidate_ids, np.concatenate(column_chunks)
+        
+        # The two queries are independent; run them on separate sessions
+        # (a session must not be shared between concurrent tasks)
+        used_success, (candidate_ids, columns) = await asyncio.gather(
+            fetch_history(), fetch_candidates()
+        )
+        if not candidate_ids:
+            return []
+        
+        count = len(candidate_ids)
+        
+        # Boost score if similar patterns were used successfully
+        history_boosts = np.fromiter(
+            (used_success.get(pattern_id, 0.0) for pattern_id in candidate_ids),
+            dtype=np.float64,
+            count=count
+        ) if used_success else np.zeros(count)
+        
+        # Score every candidate in one fused pass
+        scores = _score_candidates(
+            np.ascontiguousarray(columns[:, 0]),
+            np.ascontiguousarray(columns[:, 1]),
+            np.ascontiguousarray(columns[:, 2]),
+            history_boosts,
+            np.ascontiguousarray(columns[:, 3])
+        )
+        
+        # Top-k selection in O(N), then order only the selected scores
+        k = min(limit, count)
+        top_indices = np.argpartition(-scores, k - 1)[:k]
+        top_indices = top_indices[np.argsort(-scores[top_indices], kind="stable")]
+        
+        top_ids = [candidate_ids[i] for i in top_indices]
+        async with get_async_session(readonly=True) as session:
+            patterns = await session.execute(
+                select(LearningPattern).where(LearningPattern.id.in_(top_ids))
+            )
+            patterns_by_id = {pattern.id: pattern for pattern in patterns.scalars().all()}
+        
+        return [
+            (patterns_by_id[candidate_ids[i]], float(scores[i]))
+            for i in top_indices
+            if candidate_ids[i] in patterns_by_id
+        ]
     
     async def batch_create_patterns(self,
                                   patterns_data: List[Dict[str, Any]],
@@ -740,39 +1358,81 @@ class LearningService:
         Returns:
             List of created LearningPattern instances
         """
-        created_patterns = []
+        # Validate and normalize every row up front, without touching the DB
+        rows = []
+        seen_keys = set()
+        for pattern_data in patterns_data:
+            try:
+                row = {
+                    'pattern_name': pattern_data['pattern_name'],
+                    # Use provided agent_id or default
+                    'agent_id': pattern_data.get('agent_id', agent_id),
+                    'namespace': pattern_data.get('namespace', 'default'),
+                    'category': pattern_data['category'],
+                    'subcategory': pattern_data.get('subcategory'),
+                    'access_level': pattern_data.get('access_level', 'private'),
+                    'pattern_data': pattern_data['pattern_data'],
+                    'learning_weight': pattern_data.get('learning_weight', 1.0),
+                    'complexity_score': pattern_data.get('complexity_score')
+                }
+            except Exception as e:
+                logger.error(f"Failed to create pattern {pattern_data.get('pattern_name', 'unknown')}: {e}")
+                continue
+            
+            key = (row['pattern_name'], row['namespace'], row['agent_id'])
+            if key in seen_keys:
+                logger.error(f"Failed to create pattern {row['pattern_name']}: duplicate in batch")
+                continue
+            seen_keys.add(key)
+            rows.append(row)
+        
+        created_patterns: List[LearningPattern] = []
+        if not rows:
+            return created_patterns
         
         async with get_async_session() as session:
-            for pattern_data in patterns_data:
-                try:
-                    # Use provided agent_id or default
-                    pattern_agent_id = pattern_data.get('agent_id', agent_id)
-                    
-                    pattern = LearningPattern(
-                        pattern_name=pattern_data['pattern_name'],
-                        agent_id=pattern_agent_id,
-                        namespace=pattern_data.get('namespace', 'default'),
-                        category=pattern_data['category'],
-                        subcategory=pattern_data.get('subcategory'),
-                        access_level=pattern_data.get('access_level', 'private'),
-                        pattern_data=pattern_data['pattern_data'],
-                        learning_weight=pattern_data.get('learning_weight', 1.0),
-                        complexity_score=pattern_data.get('complexity_score')
+            for start in range(0, len(rows), self.BULK_INSERT_CHUNK_SIZE):
+                chunk = rows[start:start + self.BULK_INSERT_CHUNK_SIZE]
+                
+                # One existence check per chunk instead of one per row
+                existing = await session.execute(
+                    select(
+                        LearningPattern.pattern_name,
+                        LearningPattern.namespace,
+                        LearningPattern.agent_id
+                    ).where(
+                        tuple_(
+                            LearningPattern.pattern_name,
+                            LearningPattern.namespace,
+                            LearningPattern.agent_id
+                        ).in_([
+                            (row['pattern_name'], row['namespace'], row['agent_id'])
+                            for row in chunk
+                        ])
                     )
-                    
-                    session.add(pattern)
-                    created_patterns.append(pattern)
-                    
-                except Exception as e:
-                    logger.error(f"Failed to create pattern {pattern_data.get('pattern_name', 'unknown')}: {e}")
+                )
+                existing_keys = {tuple(row) for row in existing}
+                
+                new_rows = []
+                for row in chunk:
+                    if (row['pattern_name'], row['namespace'], row['agent_id']) in existing_keys:
+                        logger.error(f"Failed to create pattern {row['pattern_name']}: already exists in namespace")
+                    else:
+                        new_rows.append(row)
+                
+                if not new_rows:
                     continue
-            
-            # Commit all at once for better performance
-            await session.flush()
-            
-            # Refresh all patterns
-            for pattern in created_patterns:
-                await session.refresh(pattern)
-            
-            logger.info(f"Batch created {len(created_patterns)} patterns")
-            return created_patterns
\ No newline at end of file
+                
+                # Single multi-row INSERT ... RETURNING hydrates the ORM instances
+                result = await session.scalars(
+                    insert(LearningPattern).returning(LearningPattern),
+                    new_rows
+                )
+                created_patterns.extend(result.all())
+        
+        if created_patterns:
+            tags = {tag for pattern in created_patterns for tag in self._pattern_tags(pattern.agent_id)}
+            await self._invalidate(*tags)
+        
+        logger.info(f"Batch created {len(created_patterns)} patterns")
+        return created_patterns
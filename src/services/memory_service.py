@@ -15,6 +15,7 @@ import numpy as np
 
 from ..models import Memory
 from ..core.exceptions import NotFoundError, ValidationError
+from .semantic_cache import SemanticQueryCache, get_query_cache
 
 logger = logging.getLogger(__name__)
 
@@ -22,8 +23,12 @@ logger = logging.getLogger(__name__)
 class MemoryService:
     """Service for managing memories with vector search capabilities."""
     
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, query_cache: Optional[SemanticQueryCache] = None):
         self.session = session
+        # Cached searches may miss a new memory or include a changed or
+        # deleted one; they are dropped on every write so changes, including
+        # access changes, apply at once
+        self.query_cache = query_cache or get_query_cache()
     
     async def create_memory(
         self,
@@ -49,6 +54,7 @@ class MemoryService:
         self.session.add(memory)
         await self.session.commit()
         await self.session.refresh(memory)
+        self.query_cache.invalidate()
         
         logger.info(f"Created memory {memory.id} with type {memory_type}")
         return memory
@@ -60,6 +66,18 @@ class MemoryService:
         )
         return result.scalar_one_or_none()
     
+    async def get_memories_bulk(self, memory_ids: List[UUID]) -> List[Memory]:
+        """Get many memories by ID in one query, in the order requested; missing IDs are skipped."""
+        ids = list(dict.fromkeys(UUID(str(memory_id)) for memory_id in memory_ids))
+        if not ids:
+            return []
+        
+        result = await self.session.execute(
+            select(Memory).where(Memory.id.in_(ids))
+        )
+        by_id = {memory.id: memory for memory in result.scalars()}
+        return [by_id[memory_id] for memory_id in ids if memory_id in by_id]
+    
     async def update_memory(
         self, 
         memory_id: UUID,
@@ -77,6 +95,7 @@ class MemoryService:
         memory.updated_at = datetime.utcnow()
         await self.session.commit()
         await self.session.refresh(memory)
+        self.query_cache.invalidate()
         
         logger.info(f"Updated memory {memory_id}")
         return memory
@@ -89,6 +108,7 @@ class MemoryService:
         
         await self.session.delete(memory)
         await self.session.commit()
+        self.query_cache.invalidate()
         
         logger.info(f"Deleted memory {memory_id}")
         return True
@@ -249,6 +269,8 @@ class MemoryService:
         await self.session.commit()
         
         deleted_count = len(memories_to_delete)
+        if deleted_count:
+            self.query_cache.invalidate()
         logger.info(f"Cleaned up {deleted_count} old memories")
         
         return deleted_count
\ No newline at end of file
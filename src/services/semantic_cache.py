@@ -0,0 +1,332 @@
+"""
+Semantic Query Cache for TMWS
+Serves repeated (or near-duplicate) memory searches without hitting the database
+"""
+
+import logging
+import os
+import time
+from collections import OrderedDict
+from itertools import count
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Process-wide cache shared by every search and memory write path. Writes
+# only invalidate the cache of the process handling them, so it is disabled
+# when the server runs several worker processes
+_query_cache: Optional["SemanticQueryCache"] = None
+
+
+class SemanticQueryCache:
+    """
+    Cache search results keyed by query embedding or exact query text.
+
+    get_exact()/set_exact() key results on the query text, for searches
+    that match text literally (e.g. substring filters), where even a very
+    similar query can have different results.
+
+    For searches that rank by embedding, a match() lookup hits when a cached query in the same scope has a cosine
+    similarity of at least `threshold` with the new query. The scope holds
+    every search parameter other than the query text (agent, namespace,
+    limit, ...), so results are never shared across differently scoped
+    searches.
+
+    Candidates are found with random-projection LSH: each of `num_tables`
+    tables buckets embeddings by the signs of `num_bits` projections, so a
+    lookup only compares against queries sharing a bucket in some table,
+    independent of the cache size.
+
+    Cached embeddings are kept as int8 with a per-vector scale, a quarter
+    of the float32 size; the quantization error is far below the gap
+    between the threshold and 1.
+
+    The threshold can be tuned per partition (e.g. namespace) from hit
+    feedback: record_feedback() collects whether served hits were relevant,
+    and every `retune_every` reports the partition's threshold is moved to
+    the similarity cut-off that maximizes F1 over that feedback, never
+    below the base `threshold`.
+    """
+
+    # Similarity histogram resolution for threshold tuning
+    FEEDBACK_BINS = 100
+
+    def __init__(self,
+                 threshold: float = 0.92,
+                 max_size: int = 10000,
+                 ttl: float = 300.0,
+                 num_tables: int = 8,
+                 num_bits: int = 16,
+                 seed: Optional[int] = None,
+                 retune_every: int = 100):
+        self.threshold = threshold
+        self.retune_every = retune_every
+        self._thresholds: Dict[Hashable, float] = {}
+        # partition -> (2, FEEDBACK_BINS) counts of irrelevant/relevant hits by similarity
+        self._feedback: Dict[Hashable, np.ndarray] = {}
+        self._feedback_counts: Dict[Hashable, int] = {}
+        self.max_size = max_size
+        self.ttl = ttl
+        self.num_tables = num_tables
+        self.num_bits = num_bits
+        self._rng = np.random.default_rng(seed)
+        # (num_tables * num_bits, dim) projections, drawn on first use once
+        # the embedding dimension is known
+        self._projections: Optional[np.ndarray] = None
+        self._bit_weights = np.left_shift(np.uint64(1), np.arange(num_bits, dtype=np.uint64))
+        # entry_id -> (scope, int8 unit embedding, scale, results, expires_at, bucket keys,
+        # query text), in LRU order; exact-text entries have no embedding or
+        # buckets, embedding entries no text
+        self._entries: Dict[int, Tuple[Hashable, Optional[np.ndarray], float, Any, float,
+                                       Tuple[int, ...], Optional[str]]] = OrderedDict()
+        self._scopes: Dict[Hashable, Set[int]] = {}
+        # (scope, query text) -> entry id
+        self._exact: Dict[Tuple[Hashable, str], int] = {}
+        # One bucket map per table: (scope, bucket key) -> entry ids
+        self._tables: List[Dict[Tuple[Hashable, int], Set[int]]] = [{} for _ in range(num_tables)]
+        self._ids = count()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        """Return the embedding as a unit float32 vector."""
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    @classmethod
+    def similarity(cls, first, second) -> float:
+        """Cosine similarity of two embeddings."""
+        return float(cls._normalize(first) @ cls._normalize(second))
+
+    @staticmethod
+    def _quantize(vector: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Quantize a vector to int8 with a symmetric scale."""
+        peak = float(np.abs(vector).max()) if vector.size else 0.0
+        scale = peak / 127 if peak else 1.0
+        return np.round(vector / scale).astype(np.int8), scale
+
+    def _bucket_keys(self, vector: np.ndarray) -> Tuple[int, ...]:
+        """Hash a unit vector to one bucket key per table."""
+        if self._projections is None or self._projections.shape[1] != vector.shape[0]:
+            if self._projections is not None:
+                # A different embedding model; old embeddings can't be compared
+                for entry_id in [entry_id for entry_id, entry in self._entries.items() if entry[1] is not None]:
+                    self._remove(entry_id)
+            self._projections = self._rng.standard_normal(
+                (self.num_tables * self.num_bits, vector.shape[0])
+            ).astype(np.float32)
+        signs = (self._projections @ vector > 0).reshape(self.num_tables, self.num_bits)
+        return tuple(int(key) for key in signs.astype(np.uint64) @ self._bit_weights)
+
+    def _remove(self, entry_id: int) -> None:
+        """Drop an entry, its scope membership and its buckets."""
+        scope, _, _, _, _, keys, text = self._entries.pop(entry_id)
+        if text is not None:
+            self._exact.pop((scope, text), None)
+        members = self._scopes.get(scope)
+        if members is not None:
+            members.discard(entry_id)
+            if not members:
+                del self._scopes[scope]
+        for table, key in zip(self._tables, keys):
+            bucket = table.get((scope, key))
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del table[(scope, key)]
+
+    def threshold_for(self, partition: Optional[Hashable] = None) -> float:
+        """Similarity threshold in effect for a partition."""
+        return self._thresholds.get(partition, self.threshold)
+
+    def record_feedback(self, partition: Optional[Hashable], similarity: float, relevant: bool) -> None:
+        """Record whether a hit served at `similarity` was relevant."""
+        histogram = self._feedback.get(partition)
+        if histogram is None:
+            histogram = self._feedback[partition] = np.zeros((2, self.FEEDBACK_BINS), dtype=np.int64)
+        bin_index = min(int(similarity * self.FEEDBACK_BINS), self.FEEDBACK_BINS - 1)
+        histogram[int(relevant), max(bin_index, 0)] += 1
+
+        count = self._feedback_counts.get(partition, 0) + 1
+        self._feedback_counts[partition] = count
+        if count % self.retune_every == 0:
+            self._retune(partition)
+
+    def _retune(self, partition: Optional[Hashable]) -> None:
+        """Move a partition's threshold to the F1-maximizing similarity cut-off."""
+        irrelevant, relevant = self._feedback[partition]
+        total_relevant = relevant.sum()
+        if not total_relevant:
+            return
+
+        # Hits that a cut-off at each bin's lower edge would still serve
+        served_relevant = np.cumsum(relevant[::-1])[::-1]
+        served = served_relevant + np.cumsum(irrelevant[::-1])[::-1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            precision = np.where(served > 0, served_relevant / served, 0.0)
+            recall = served_relevant / total_relevant
+            f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+
+        cut_offs = np.arange(self.FEEDBACK_BINS) / self.FEEDBACK_BINS
+        f1[cut_offs < self.threshold] = -1.0
+        tuned = float(cut_offs[int(np.argmax(f1))])
+        if tuned != self.threshold_for(partition):
+            logger.info(f"Semantic cache threshold for {partition!r} tuned to {tuned:.2f}")
+        self._thresholds[partition] = tuned
+
+    def get(self, embedding, scope: Hashable, partition: Optional[Hashable] = None) -> Optional[Any]:
+        """Return cached results for a similar query in the same scope, if any."""
+        match = self.match(embedding, scope, partition)
+        return match[0] if match is not None else None
+
+    def match(self,
+              embedding,
+              scope: Hashable,
+              partition: Optional[Hashable] = None) -> Optional[Tuple[Any, float]]:
+        """Return (cached results, similarity) for a similar query in the same scope, if any."""
+        if scope not in self._scopes:
+            self.misses += 1
+            return None
+
+        query = self._normalize(embedding)
+        candidates = set()
+        for table, key in zip(self._tables, self._bucket_keys(query)):
+            candidates.update(table.get((scope, key), ()))
+
+        now = time.monotonic()
+        for entry_id in candidates:
+            if self._entries[entry_id][4] <= now:
+                self._remove(entry_id)
+        candidates = [entry_id for entry_id in candidates if entry_id in self._entries]
+        if not candidates:
+            self.misses += 1
+            return None
+
+        # Unit vectors, so the rescaled int8 dot products are the cosine
+        # similarities; int32 accumulation avoids overflow
+        quantized, scale = self._quantize(query)
+        entries = [self._entries[entry_id] for entry_id in candidates]
+        cached = np.stack([entry[1] for entry in entries]).astype(np.int32)
+        cached_scales = np.array([entry[2] for entry in entries], dtype=np.float32)
+        similarities = (cached @ quantized.astype(np.int32)) * cached_scales * scale
+        best = int(np.argmax(similarities))
+        similarity = float(similarities[best])
+        if similarity < self.threshold_for(partition):
+            self.misses += 1
+            return None
+
+        entry_id = candidates[best]
+        self._entries.move_to_end(entry_id)
+        self.hits += 1
+        return self._entries[entry_id][3], similarity
+
+    def set(self, embedding, scope: Hashable, results: Any) -> None:
+        """Cache results for a query, evicting least recently used entries beyond max_size."""
+        vector = self._normalize(embedding)
+        keys = self._bucket_keys(vector)
+        quantized, scale = self._quantize(vector)
+        entry_id = next(self._ids)
+        self._entries[entry_id] = (scope, quantized, scale, results, time.monotonic() + self.ttl, keys, None)
+        self._scopes.setdefault(scope, set()).add(entry_id)
+        for table, key in zip(self._tables, keys):
+            table.setdefault((scope, key), set()).add(entry_id)
+
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+
+    def get_exact(self, text: str, scope: Hashable) -> Optional[Any]:
+        """Return cached results for exactly this query text in the same scope, if any."""
+        entry_id = self._exact.get((scope, text))
+        if entry_id is None:
+            self.misses += 1
+            return None
+
+        if self._entries[entry_id][4] <= time.monotonic():
+            self._remove(entry_id)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(entry_id)
+        self.hits += 1
+        return self._entries[entry_id][3]
+
+    def set_exact(self, text: str, scope: Hashable, results: Any) -> None:
+        """Cache results for a query text, evicting least recently used entries beyond max_size."""
+        previous = self._exact.get((scope, text))
+        if previous is not None:
+            self._remove(previous)
+
+        entry_id = next(self._ids)
+        self._entries[entry_id] = (scope, None, 0.0, results, time.monotonic() + self.ttl, (), text)
+        self._exact[(scope, text)] = entry_id
+        self._scopes.setdefault(scope, set()).add(entry_id)
+
+        while len(self._entries) > self.max_size:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate(self, predicate=None) -> int:
+        """
+        Drop cached entries.
+
+        Args:
+            predicate: Called with each scope; entries of scopes it returns
+                True for are dropped. Drops everything when omitted.
+
+        Returns:
+            Number of entries dropped
+        """
+        if predicate is None:
+            dropped = len(self._entries)
+            self._entries.clear()
+            self._scopes.clear()
+            self._exact.clear()
+            for table in self._tables:
+                table.clear()
+            return dropped
+
+        entry_ids: List[int] = [
+            entry_id
+            for scope, members in list(self._scopes.items()) if predicate(scope)
+            for entry_id in members
+        ]
+        for entry_id in entry_ids:
+            self._remove(entry_id)
+        return len(entry_ids)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "scopes": len(self._scopes),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "thresholds": {str(partition): value for partition, value in self._thresholds.items()}
+        }
+
+
+
+def get_query_cache() -> SemanticQueryCache:
+    """
+    Get the global semantic query cache instance.
+
+    The cache holds nothing (max_size 0) when WEB_CONCURRENCY reports more
+    than one worker process, since other workers' writes can't reach it.
+    """
+    global _query_cache
+    if _query_cache is None:
+        try:
+            workers = int(os.environ.get("WEB_CONCURRENCY") or 1)
+        except ValueError:
+            workers = 1
+        if workers > 1:
+            logger.info(f"Semantic query cache disabled for {workers} worker processes")
+            _query_cache = SemanticQueryCache(max_size=0)
+        else:
+            _query_cache = SemanticQueryCache()
+    return _query_cache
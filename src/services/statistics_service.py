@@ -3,34 +3,449 @@ Statistics Collection Service for TMWS v2.0
 Comprehensive metrics and analytics for agent activities.
 """
 
-from typing import Dict, Any, List, Optional
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Tuple, TypeVar
 from datetime import datetime, timedelta
-from collections import defaultdict
+from dataclasses import dataclass
+from collections import OrderedDict, defaultdict
+import asyncio
 import json
+import time
 
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
-from sqlalchemy.sql import text
+import numpy as np
 
-from ..models.agent import Agent
-from ..models.memory import Memory, MemoryPattern
-from ..core.database import get_session
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import Date, Float, Integer, Text, any_, bindparam, select, func, and_, or_, cast, desc
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, aggregate_order_by
+from sqlalchemy.sql import column, table, text
+
+from ..models.agent import Agent, AccessLevel
+from ..models.memory import Memory, MemoryConsolidation, MemoryPattern
+from ..core.database import get_session_maker
 import logging
 
+try:
+    import numba
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+
+@dataclass(frozen=True, slots=True)
+class AgentSnapshot:
+    """Detached, immutable copy of the Agent columns used for statistics."""
+    agent_id: str
+    display_name: str
+    status: str
+    health_score: float
+    total_memories: int
+    total_tasks: int
+    success_rate: float
+    average_response_time_ms: Optional[float]
+    created_at: Optional[datetime]
+    last_active_at: Optional[datetime]
+    
+    @classmethod
+    def from_row(cls, row) -> "AgentSnapshot":
+        """Build a snapshot from a row of _AGENT_SNAPSHOT_QUERY."""
+        return cls(
+            agent_id=row.agent_id,
+            display_name=row.display_name,
+            status=row.status.value,
+            health_score=row.health_score,
+            total_memories=row.total_memories,
+            total_tasks=row.total_tasks,
+            # Same as Agent.success_rate, which is a Python property
+            success_rate=row.successful_tasks / row.total_tasks if row.total_tasks else 0.0,
+            average_response_time_ms=row.average_response_time_ms,
+            created_at=row.created_at,
+            last_active_at=row.last_active_at
+        )
+
+
+# Only the columns AgentSnapshot needs, not full ORM rows
+_AGENT_SNAPSHOT_QUERY = select(
+    Agent.agent_id,
+    Agent.display_name,
+    Agent.status,
+    Agent.health_score,
+    Agent.total_memories,
+    Agent.total_tasks,
+    Agent.successful_tasks,
+    Agent.average_response_time_ms,
+    Agent.created_at,
+    Agent.last_active_at
+)
+
+
+# Raw statements are built once at import rather than per call; the agent
+# ids are one typed array parameter, so the SQL sent is identical for any
+# number of agents and asyncpg reuses its prepared statements
+
+# Per-agent memory aggregates, materialized by migration 006
+_AGENT_MEMORY_STATS = table(
+    "agent_memory_stats",
+    column("agent_id", Text),
+    column("total_memories", Integer),
+    column("average_memory_length", Float),
+    column("shared_memory_count", Integer),
+    *(column(f"access_{level.value}", Integer) for level in AccessLevel),
+    column("importance_low", Integer),
+    column("importance_medium", Integer),
+    column("importance_high", Integer)
+)
+
+# (distribution key, view column) pairs for the JSON distributions
+_ACCESS_LEVEL_COLUMNS = tuple((level.value, f"access_{level.value}") for level in AccessLevel)
+_IMPORTANCE_COLUMNS = tuple((level, f"importance_{level}") for level in ("low", "medium", "high"))
+
+_REFRESH_AGENT_MEMORY_STATS = text("REFRESH MATERIALIZED VIEW CONCURRENTLY agent_memory_stats")
+
+# The engine disables JIT for predictable OLTP latency; section queries are
+# aggregate scans over many rows, so JIT is re-enabled for their transaction.
+# The default jit_above_cost still keeps small (single agent) plans interpreted.
+_ENABLE_JIT = text("SET LOCAL jit = on")
+
+# Daily memory creation per agent, densified in SQL: every day from
+# :start_date to today is returned, with zero counts for days without memories
+_DAILY_MEMORY_QUERY = text("""
+    WITH daily AS (
+        SELECT agent_id, DATE(created_at) AS date, COUNT(*) AS count
+        FROM memories_v2
+        WHERE agent_id = ANY(:agent_ids) AND created_at >= CAST(:start_date AS date)
+        GROUP BY agent_id, DATE(created_at)
+    )
+    SELECT a.agent_id, d.date::date AS date, COALESCE(daily.count, 0) AS count
+    FROM unnest(CAST(:agent_ids AS text[])) AS a(agent_id)
+    CROSS JOIN generate_series(CAST(:start_date AS date), current_date, interval '1 day') AS d(date)
+    LEFT JOIN daily ON daily.agent_id = a.agent_id AND daily.date = d.date::date
+    ORDER BY a.agent_id, d.date
+""").bindparams(
+    bindparam("agent_ids", type_=ARRAY(Text)),
+    bindparam("start_date", type_=Date)
+)
+
+# Shared-by counts, shared-with counts and the top collaborators (ranked
+# within each agent) in one statement
+_COLLABORATION_QUERY = text("""
+    WITH shared_by AS (
+        SELECT shared_by_agent_id AS agent_id, COUNT(DISTINCT memory_id) AS count
+        FROM memory_sharing
+        WHERE shared_by_agent_id = ANY(:agent_ids)
+        GROUP BY shared_by_agent_id
+    ),
+    shared_with AS (
+        SELECT shared_with_agent_id AS agent_id, COUNT(DISTINCT memory_id) AS count
+        FROM memory_sharing
+        WHERE shared_with_agent_id = ANY(:agent_ids)
+        GROUP BY shared_with_agent_id
+    ),
+    collaborators AS (
+        SELECT shared_by_agent_id AS agent_id, shared_with_agent_id, COUNT(*) AS count,
+               ROW_NUMBER() OVER (
+                   PARTITION BY shared_by_agent_id ORDER BY COUNT(*) DESC
+               ) AS rank
+        FROM memory_sharing
+        WHERE shared_by_agent_id = ANY(:agent_ids)
+        GROUP BY shared_by_agent_id, shared_with_agent_id
+    )
+    SELECT
+        a.agent_id,
+        COALESCE(b.count, 0) AS memories_shared,
+        COALESCE(w.count, 0) AS memories_received,
+        (
+            SELECT json_agg(
+                json_build_object('agent_id', c.shared_with_agent_id, 'shared_count', c.count)
+                ORDER BY c.rank
+            )
+            FROM collaborators c
+            WHERE c.agent_id = a.agent_id AND c.rank <= 5
+        ) AS top_collaborators
+    FROM unnest(CAST(:agent_ids AS text[])) AS a(agent_id)
+    LEFT JOIN shared_by b ON b.agent_id = a.agent_id
+    LEFT JOIN shared_with w ON w.agent_id = a.agent_id
+""").bindparams(bindparam("agent_ids", type_=ARRAY(Text)))
+
+
+def _agent_scores_numpy(success_rates: np.ndarray,
+                        health_scores: np.ndarray,
+                        response_times_ms: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute reliability and efficiency scores (0-1) for many agents.
+    
+    Unknown response times are NaN.
+    """
+    known = ~np.isnan(response_times_ms)
+    fast = np.where(known & (response_times_ms < 1000), 1.0, 0.5)
+    reliability = (success_rates + health_scores + fast) / 3
+    
+    # Faster response = higher efficiency
+    efficiency = np.select(
+        [~known, response_times_ms < 100, response_times_ms < 500, response_times_ms < 1000],
+        [0.5, 1.0, 0.8, 0.6],
+        default=0.4
+    )
+    return reliability, efficiency
+
+
+def _collaboration_scores_numpy(shared: np.ndarray, received: np.ndarray) -> np.ndarray:
+    """Compute collaboration scores (0-1) for many agents."""
+    high = np.maximum(shared, received)
+    # Balance between sharing and receiving
+    balance = np.divide(np.minimum(shared, received), high, out=np.zeros_like(high), where=high > 0)
+    # Activity level
+    activity = np.minimum((shared + received) / 100, 1.0)  # Cap at 100 for full score
+    return (balance + activity) / 2
+
+
+if NUMBA_AVAILABLE:
+    # No fastmath here: its nnan flag lets LLVM fold away the isnan()
+    # check that marks unknown response times
+    @numba.njit(cache=True)
+    def _agent_scores(success_rates, health_scores, response_times_ms):
+        """Compute reliability and efficiency scores in a single compiled pass."""
+        n = success_rates.shape[0]
+        reliability = np.empty(n)
+        efficiency = np.empty(n)
+        for i in range(n):
+            response_time = response_times_ms[i]
+            if np.isnan(response_time):
+                fast = 0.5
+                efficiency[i] = 0.5
+            else:
+                fast = 1.0 if response_time < 1000 else 0.5
+                if response_time < 100:
+                    efficiency[i] = 1.0
+                elif response_time < 500:
+                    efficiency[i] = 0.8
+                elif response_time < 1000:
+                    efficiency[i] = 0.6
+                else:
+                    efficiency[i] = 0.4
+            reliability[i] = (success_rates[i] + health_scores[i] + fast) / 3
+        return reliability, efficiency
+    
+    @numba.njit(cache=True, fastmath=True)
+    def _collaboration_scores(shared, received):
+        """Compute collaboration scores in a single compiled pass."""
+        scores = np.empty(shared.shape[0])
+        for i in range(shared.shape[0]):
+            high = max(shared[i], received[i])
+            balance = min(shared[i], received[i]) / high if high > 0 else 0.0
+            activity = min((shared[i] + received[i]) / 100, 1.0)
+            scores[i] = (balance + activity) / 2
+        return scores
+else:
+    _agent_scores = _agent_scores_numpy
+    _collaboration_scores = _collaboration_scores_numpy
+
+
+def _any_agent(column, agent_ids: List[str]):
+    """Match column against agent_ids, bound as one array parameter instead of an IN list."""
+    return column == any_(bindparam("agent_ids", agent_ids, type_=ARRAY(Text), unique=True))
+
 
 class StatisticsService:
     """Service for collecting and analyzing agent statistics."""
     
-    def __init__(self, session: AsyncSession = None):
-        self.session = session
-        self.cache: Dict[str, Any] = {}
-        self.cache_ttl = 300  # 5 minutes
-        
-    async def initialize(self, session: AsyncSession = None):
+    # Per-section TTLs in seconds; agent-row derived stats change with every
+    # task while historical aggregates move slowly
+    SECTION_TTLS = {
+        "agent": 30,
+        "memory_stats": 300,
+        "access_patterns": 300,
+        "learning_stats": 300,
+        "time_series": 600,
+        "collaboration_stats": 300
+    }
+    
+    # Agents per section query in bulk collection, bounding result set size
+    BULK_CHUNK_SIZE = 500
+    
+    # Seconds between refreshes of the agent_memory_stats materialized view
+    MEMORY_STATS_REFRESH_INTERVAL = 60
+    
+    # Agents per background snapshot refresh batch
+    SNAPSHOT_BATCH_SIZE = 1000
+    
+    def __init__(self,
+                 session_maker: Optional[async_sessionmaker] = None,
+                 max_concurrency: int = 16,
+                 analytics_jit: bool = True):
+        self.session_maker = session_maker
+        # Caps concurrent section queries (and so pooled connections in use)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.analytics_jit = analytics_jit
+        # (agent_id, section) -> (expires_at (time.monotonic()), data), in LRU order
+        self.cache: Dict[Tuple[str, str], Tuple[float, Any]] = OrderedDict()
+        self.cache_ttl = 300  # Default TTL, 5 minutes
+        self.cache_max_size = 4096
+        # agent_id -> (collected_at (time.monotonic()), metrics); served
+        # stale while a background refresh runs
+        self.snapshots: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._snapshot_task: Optional[asyncio.Task] = None
+        
+    async def initialize(self, session_maker: Optional[async_sessionmaker] = None):
         """Initialize the service."""
-        self.session = session or await get_session()
+        self.session_maker = session_maker or self.session_maker or get_session_maker()
+    
+    async def refresh_memory_stats(self) -> None:
+        """Refresh the materialized per-agent memory aggregates without blocking readers."""
+        async with self.session_maker() as session:
+            await session.execute(_REFRESH_AGENT_MEMORY_STATS)
+            await session.commit()
+    
+    async def _refresh_loop(self) -> None:
+        """Periodically refresh the materialized memory aggregates."""
+        while True:
+            await asyncio.sleep(self.MEMORY_STATS_REFRESH_INTERVAL)
+            try:
+                await self.refresh_memory_stats()
+            except Exception as e:
+                logger.error(f"Failed to refresh agent memory stats: {e}")
+    
+    async def refresh_all_agents(self) -> int:
+        """
+        Recollect metrics snapshots for every agent.
+        
+        Returns:
+            Number of agents refreshed
+        """
+        async with self.session_maker() as session:
+            result = await session.execute(select(Agent.agent_id))
+            agent_ids = list(result.scalars())
+        
+        refreshed = 0
+        for start in range(0, len(agent_ids), self.SNAPSHOT_BATCH_SIZE):
+            batch = agent_ids[start:start + self.SNAPSHOT_BATCH_SIZE]
+            refreshed += self._store_snapshots(await self.collect_agent_metrics_bulk(batch))
+        
+        # Drop snapshots of agents that no longer exist
+        for agent_id in self.snapshots.keys() - set(agent_ids):
+            del self.snapshots[agent_id]
+        
+        return refreshed
+    
+    async def _snapshot_loop(self) -> None:
+        """Periodically recollect metrics snapshots for all agents."""
+        while True:
+            try:
+                refreshed = await self.refresh_all_agents()
+                logger.debug(f"Refreshed metrics snapshots for {refreshed} agents")
+            except Exception as e:
+                logger.error(f"Failed to refresh agent metrics snapshots: {e}")
+            await asyncio.sleep(self.cache_ttl)
+    
+    async def start(self) -> None:
+        """Start the background refresh of materialized statistics and snapshots."""
+        if self._refresh_task:
+            logger.warning("Statistics refresh already started")
+            return
+        self._refresh_task = asyncio.create_task(self._refresh_loop())
+        self._snapshot_task = asyncio.create_task(self._snapshot_loop())
+    
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Stop the background refreshes."""
+        tasks = [self._refresh_task, self._snapshot_task, *self._refreshing.values()]
+        for task in tasks:
+            if task:
+                task.cancel()
+                try:
+                    await asyncio.wait_for(task, timeout=timeout)
+                except (asyncio.TimeoutError, asyncio.CancelledError):
+                    pass
+        self._refresh_task = None
+        self._snapshot_task = None
+        self._refreshing.clear()
+    
+    async def _run_in_session(self,
+                              section: Callable[..., Awaitable[T]],
+                              *args: Any) -> T:
+        """
+        Run a section query in its own session.
+        
+        An AsyncSession cannot be shared by concurrent coroutines, so each
+        section gets its own session (and pooled connection). At most
+        max_concurrency sections run at once. Sections load no entities, so
+        they run their Core statements on session.connection() directly.
+        """
+        async with self._semaphore:
+            async with self.session_maker() as session:
+                if self.analytics_jit:
+                    await session.execute(_ENABLE_JIT)
+                return await section(session, *args)
+    
+    def _get_cached(self, agent_id: str, section: str) -> Optional[Any]:
+        """Get a cached section if not expired."""
+        key = (agent_id, section)
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        
+        if time.monotonic() >= entry[0]:
+            del self.cache[key]
+            return None
+        
+        self.cache.move_to_end(key)
+        return entry[1]
+    
+    def _set_cached(self, agent_id: str, section: str, data: Any) -> None:
+        """Cache a section, dropping least recently used entries beyond cache_max_size."""
+        key = (agent_id, section)
+        self.cache[key] = (time.monotonic() + self.SECTION_TTLS.get(section, self.cache_ttl), data)
+        self.cache.move_to_end(key)
+        
+        while len(self.cache) > self.cache_max_size:
+            self.cache.popitem(last=False)
+    
+    def invalidate(self, agent_id: str) -> None:
+        """Drop cached metrics for an agent; call after writes affecting it."""
+        for section in self.SECTION_TTLS:
+            self.cache.pop((agent_id, section), None)
+        self.snapshots.pop(agent_id, None)
+    
+    def _store_snapshots(self, metrics: Dict[str, Dict[str, Any]]) -> int:
+        """Keep successfully collected metrics as snapshots; returns how many were stored."""
+        collected_at = time.monotonic()
+        stored = 0
+        for agent_id, agent_metrics in metrics.items():
+            if "error" not in agent_metrics:
+                self.snapshots[agent_id] = (collected_at, agent_metrics)
+                stored += 1
+        return stored
+    
+    async def _refresh_snapshot(self, agent_id: str) -> None:
+        """Recollect one agent's snapshot in the background."""
+        try:
+            self._store_snapshots({agent_id: await self.collect_agent_metrics(agent_id)})
+        except Exception as e:
+            logger.error(f"Failed to refresh metrics snapshot for {agent_id}: {e}")
+        finally:
+            self._refreshing.pop(agent_id, None)
+    
+    async def get_agent_metrics(self, agent_id: str) -> Dict[str, Any]:
+        """
+        Get an agent's metrics from its snapshot (stale-while-revalidate).
+        
+        A snapshot older than cache_ttl is still returned, and a background
+        refresh is scheduled for it. Metrics are only collected inline for
+        agents without a snapshot.
+        """
+        snapshot = self.snapshots.get(agent_id)
+        if snapshot is None:
+            metrics = await self.collect_agent_metrics(agent_id)
+            self._store_snapshots({agent_id: metrics})
+            return metrics
+        
+        collected_at, metrics = snapshot
+        if time.monotonic() - collected_at >= self.cache_ttl and agent_id not in self._refreshing:
+            self._refreshing[agent_id] = asyncio.create_task(self._refresh_snapshot(agent_id))
+        return metrics
     
     async def collect_agent_metrics(self, agent_id: str) -> Dict[str, Any]:
         """
@@ -42,42 +457,118 @@ class StatisticsService:
         - Performance metrics
         - Learning insights
         """
+        metrics = await self.collect_agent_metrics_bulk([agent_id])
+        return metrics[agent_id]
+    
+    async def collect_agent_metrics_bulk(self, agent_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Collect comprehensive metrics for many agents at once.
+        
+        Each section is one query grouped by agent_id, so the number of
+        round-trips does not grow with the number of agents.
+        
+        Returns:
+            Mapping of agent_id to its metrics (or an error entry)
+        """
+        agent_ids = list(dict.fromkeys(agent_ids))
+        if not agent_ids:
+            return {}
         
         try:
-            # Get agent
-            result = await self.session.execute(
-                select(Agent).where(Agent.agent_id == agent_id)
-            )
-            agent = result.scalar_one_or_none()
+            summaries = {}
+            for agent_id in agent_ids:
+                cached = self._get_cached(agent_id, "agent")
+                if cached is not None:
+                    summaries[agent_id] = cached
             
-            if not agent:
-                return {"error": "Agent not found"}
+            uncached_agents = [agent_id for agent_id in agent_ids if agent_id not in summaries]
+            if uncached_agents:
+                # Get agents as plain snapshots, safe to share across sessions
+                async with self.session_maker() as session:
+                    result = await session.execute(
+                        _AGENT_SNAPSHOT_QUERY.where(_any_agent(Agent.agent_id, uncached_agents))
+                    )
+                    agents = [AgentSnapshot.from_row(row) for row in result]
+                
+                performance_metrics = await self._get_performance_metrics(agents)
+                for agent in agents:
+                    summary = {
+                        "display_name": agent.display_name,
+                        "basic_stats": await self._get_basic_stats(agent),
+                        "performance_metrics": performance_metrics[agent.agent_id]
+                    }
+                    self._set_cached(agent.agent_id, "agent", summary)
+                    summaries[agent.agent_id] = summary
             
-            # Collect various metrics
-            metrics = {
-                "agent_id": agent_id,
-                "display_name": agent.display_name,
-                "basic_stats": await self._get_basic_stats(agent),
-                "memory_stats": await self._get_memory_stats(agent_id),
-                "access_patterns": await self._get_access_patterns(agent_id),
-                "performance_metrics": await self._get_performance_metrics(agent),
-                "learning_stats": await self._get_learning_stats(agent_id),
-                "time_series": await self._get_time_series_data(agent_id),
-                "collaboration_stats": await self._get_collaboration_stats(agent_id),
-                "collected_at": datetime.utcnow().isoformat()
+            found_agents = [agent_id for agent_id in agent_ids if agent_id in summaries]
+            
+            section_fetchers = {
+                "memory_stats": self._get_memory_stats,
+                "access_patterns": self._get_access_patterns,
+                "learning_stats": self._get_learning_stats,
+                "time_series": self._get_time_series_data,
+                "collaboration_stats": self._get_collaboration_stats
             }
             
+            sections: Dict[str, Dict[str, Any]] = {section: {} for section in section_fetchers}
+            missing: Dict[str, List[str]] = {}
+            for section in section_fetchers:
+                for agent_id in found_agents:
+                    cached = self._get_cached(agent_id, section)
+                    if cached is not None:
+                        sections[section][agent_id] = cached
+                    else:
+                        missing.setdefault(section, []).append(agent_id)
+            
+            # Independent sections (and agent chunks) run concurrently, one
+            # session each, so latency is the slowest query rather than the sum
+            tasks = [
+                (section, section_agents[start:start + self.BULK_CHUNK_SIZE])
+                for section, section_agents in missing.items()
+                for start in range(0, len(section_agents), self.BULK_CHUNK_SIZE)
+            ]
+            results = await asyncio.gather(*(
+                self._run_in_session(section_fetchers[section], chunk)
+                for section, chunk in tasks
+            ))
+            for (section, _), section_results in zip(tasks, results):
+                for agent_id, data in section_results.items():
+                    self._set_cached(agent_id, section, data)
+                    sections[section][agent_id] = data
+            
+            collected_at = datetime.utcnow().isoformat()
+            metrics = {}
+            for agent_id in agent_ids:
+                summary = summaries.get(agent_id)
+                if summary is None:
+                    metrics[agent_id] = {"error": "Agent not found"}
+                    continue
+                
+                # Collect various metrics
+                metrics[agent_id] = {
+                    "agent_id": agent_id,
+                    "display_name": summary["display_name"],
+                    "basic_stats": summary["basic_stats"],
+                    "memory_stats": sections["memory_stats"][agent_id],
+                    "access_patterns": sections["access_patterns"][agent_id],
+                    "performance_metrics": summary["performance_metrics"],
+                    "learning_stats": sections["learning_stats"][agent_id],
+                    "time_series": sections["time_series"][agent_id],
+                    "collaboration_stats": sections["collaboration_stats"][agent_id],
+                    "collected_at": collected_at
+                }
+            
             return metrics
             
         except Exception as e:
-            logger.error(f"Error collecting metrics for {agent_id}: {e}")
-            return {"error": str(e)}
+            logger.error(f"Error collecting metrics for {', '.join(agent_ids)}: {e}")
+            return {agent_id: {"error": str(e)} for agent_id in agent_ids}
     
-    async def _get_basic_stats(self, agent: Agent) -> Dict[str, Any]:
+    async def _get_basic_stats(self, agent: AgentSnapshot) -> Dict[str, Any]:
         """Get basic agent statistics."""
         
         return {
-            "status": agent.status.value,
+            "status": agent.status,
             "health_score": agent.health_score,
             "total_memories": agent.total_memories,
             "total_tasks": agent.total_tasks,
@@ -88,237 +579,310 @@ class StatisticsService:
             "uptime_hours": self._calculate_uptime(agent.created_at, agent.last_active_at)
         }
     
-    async def _get_memory_stats(self, agent_id: str) -> Dict[str, Any]:
-        """Get memory-related statistics."""
-        
-        # Total memories
-        total_result = await self.session.execute(
-            select(func.count(Memory.id)).where(Memory.agent_id == agent_id)
-        )
-        total_memories = total_result.scalar() or 0
-        
-        # Average memory length
-        avg_length_result = await self.session.execute(
-            select(func.avg(func.length(Memory.content))).where(Memory.agent_id == agent_id)
-        )
-        avg_length = avg_length_result.scalar() or 0
-        
-        # Memory by access level
-        access_level_result = await self.session.execute(
-            select(Memory.access_level, func.count(Memory.id))
-            .where(Memory.agent_id == agent_id)
-            .group_by(Memory.access_level)
-        )
-        access_levels = {str(level): count for level, count in access_level_result}
-        
-        # Most used tags
-        tag_query = text("""
-            SELECT tag, COUNT(*) as count
-            FROM (
-                SELECT jsonb_array_elements_text(tags) as tag
-                FROM memories_v2
-                WHERE agent_id = :agent_id
-            ) t
-            GROUP BY tag
-            ORDER BY count DESC
-            LIMIT 10
-        """)
-        
-        tag_result = await self.session.execute(tag_query, {"agent_id": agent_id})
-        top_tags = [{"tag": row[0], "count": row[1]} for row in tag_result]
-        
-        # Memory importance distribution
-        importance_result = await self.session.execute(
-            select(
-                func.case(
-                    (Memory.importance_score < 0.33, 'low'),
-                    (Memory.importance_score < 0.67, 'medium'),
-                    else_='high'
-                ).label('importance_level'),
-                func.count(Memory.id)
-            )
-            .where(Memory.agent_id == agent_id)
-            .group_by('importance_level')
-        )
-        importance_dist = {level: count for level, count in importance_result}
-        
-        return {
-            "total_memories": total_memories,
-            "average_memory_length": float(avg_length) if avg_length else 0,
-            "access_level_distribution": access_levels,
-            "top_tags": top_tags,
-            "importance_distribution": importance_dist,
-            "shared_memory_count": await self._count_shared_memories(agent_id),
-            "consolidated_memory_count": await self._count_consolidated_memories(agent_id)
+    async def _get_memory_stats(self, session: AsyncSession, agent_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get memory-related statistics per agent."""
+        
+        # Slowly changing aggregates are read from the materialized view
+        # (see refresh_memory_stats); tags and consolidations are computed
+        # live in the same round-trip
+        stats_view = _AGENT_MEMORY_STATS
+        
+        base = select(
+            Memory.agent_id,
+            Memory.tags
+        ).where(_any_agent(Memory.agent_id, agent_ids)).cte("base")
+        
+        # Most used tags, ranked within each agent
+        tag = func.jsonb_array_elements_text(cast(base.c.tags, JSONB)).column_valued("tag")
+        tag_counts = select(
+            base.c.agent_id,
+            tag,
+            func.count().label("count"),
+            func.row_number().over(
+                partition_by=base.c.agent_id,
+                order_by=desc(func.count())
+            ).label("rank")
+        ).select_from(base).group_by(base.c.agent_id, tag).subquery("tag_counts")
+        
+        # Distributions come back as JSON objects; levels without memories
+        # are stripped as nulls
+        def distribution(columns):
+            return func.json_strip_nulls(func.json_build_object(*(
+                arg
+                for key, name in columns
+                for arg in (key, func.nullif(stats_view.c[name], 0))
+            )))
+        
+        query = select(
+            stats_view.c.agent_id,
+            stats_view.c.total_memories,
+            stats_view.c.average_memory_length,
+            stats_view.c.shared_memory_count,
+            distribution(_ACCESS_LEVEL_COLUMNS).label("access_level_distribution"),
+            distribution(_IMPORTANCE_COLUMNS).label("importance_distribution"),
+            select(func.json_agg(aggregate_order_by(
+                func.json_build_object('tag', tag_counts.c.tag, 'count', tag_counts.c.count),
+                tag_counts.c.rank
+            ))).where(and_(
+                tag_counts.c.agent_id == stats_view.c.agent_id,
+                tag_counts.c.rank <= 10
+            )).scalar_subquery().label("top_tags"),
+            select(func.count(func.distinct(MemoryConsolidation.consolidated_memory_id))).where(
+                MemoryConsolidation.agent_id == stats_view.c.agent_id
+            ).scalar_subquery().label("consolidated_memory_count")
+        ).where(_any_agent(stats_view.c.agent_id, agent_ids))
+        
+        stats = {
+            agent_id: {
+                "total_memories": 0,
+                "average_memory_length": 0,
+                "access_level_distribution": {},
+                "top_tags": [],
+                "importance_distribution": {},
+                "shared_memory_count": 0,
+                "consolidated_memory_count": 0
+            }
+            for agent_id in agent_ids
         }
-    
-    async def _get_access_patterns(self, agent_id: str) -> Dict[str, Any]:
-        """Analyze memory access patterns."""
         
-        # Most accessed memories
-        most_accessed = await self.session.execute(
-            select(Memory.id, Memory.content[:100], Memory.access_count)
-            .where(Memory.agent_id == agent_id)
-            .order_by(Memory.access_count.desc())
-            .limit(5)
-        )
-        
-        top_accessed = [
-            {
-                "id": str(mem_id),
-                "preview": content,
-                "access_count": count
+        connection = await session.connection()
+        result = await connection.stream(query)
+        async for row in result.mappings():
+            stats[row["agent_id"]] = {
+                "total_memories": row["total_memories"] or 0,
+                "average_memory_length": float(row["average_memory_length"]) if row["average_memory_length"] else 0,
+                "access_level_distribution": row["access_level_distribution"],
+                "top_tags": row["top_tags"] or [],
+                "importance_distribution": row["importance_distribution"],
+                "shared_memory_count": row["shared_memory_count"] or 0,
+                "consolidated_memory_count": row["consolidated_memory_count"] or 0
             }
-            for mem_id, content, count in most_accessed
-        ]
         
-        # Access time distribution (hourly)
-        hourly_query = text("""
-            SELECT EXTRACT(HOUR FROM accessed_at) as hour, COUNT(*) as count
-            FROM memories_v2
-            WHERE agent_id = :agent_id AND accessed_at IS NOT NULL
-            GROUP BY hour
-            ORDER BY hour
-        """)
+        return stats
+    
+    async def _get_access_patterns(self, session: AsyncSession, agent_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Analyze memory access patterns per agent."""
         
-        hourly_result = await self.session.execute(hourly_query, {"agent_id": agent_id})
-        hourly_distribution = {int(hour): count for hour, count in hourly_result}
+        recent_cutoff = datetime.utcnow() - timedelta(days=7)
+        
+        base = select(
+            Memory.agent_id,
+            Memory.id,
+            Memory.content,
+            Memory.access_count,
+            Memory.accessed_at
+        ).where(_any_agent(Memory.agent_id, agent_ids)).cte("base")
         
         # Recent access activity
-        recent_cutoff = datetime.utcnow() - timedelta(days=7)
-        recent_result = await self.session.execute(
-            select(func.count(Memory.id))
-            .where(and_(
-                Memory.agent_id == agent_id,
-                Memory.accessed_at >= recent_cutoff
-            ))
+        totals = select(
+            base.c.agent_id,
+            func.count().filter(base.c.accessed_at >= recent_cutoff).label("recent_accesses_7d")
+        ).group_by(base.c.agent_id).subquery("totals")
+        
+        # Most accessed memories, ranked within each agent
+        ranked = select(
+            base.c.agent_id,
+            base.c.id,
+            func.substr(base.c.content, 1, 100).label("preview"),
+            base.c.access_count,
+            func.row_number().over(
+                partition_by=base.c.agent_id,
+                order_by=desc(base.c.access_count)
+            ).label("rank")
+        ).subquery("ranked")
+        
+        # Access time distribution (hourly)
+        hour = cast(func.extract('hour', base.c.accessed_at), Integer)
+        hourly = select(
+            base.c.agent_id,
+            hour.label("hour"),
+            func.count().label("count")
+        ).where(base.c.accessed_at.is_not(None)).group_by(base.c.agent_id, hour).subquery("hourly")
+        
+        query = select(
+            totals,
+            select(func.json_agg(aggregate_order_by(
+                func.json_build_object(
+                    'id', ranked.c.id,
+                    'preview', ranked.c.preview,
+                    'access_count', ranked.c.access_count
+                ),
+                ranked.c.rank
+            ))).where(and_(
+                ranked.c.agent_id == totals.c.agent_id,
+                ranked.c.rank <= 5
+            )).scalar_subquery().label("top_accessed_memories"),
+            select(func.json_object_agg(
+                hourly.c.hour, hourly.c.count
+            )).where(
+                hourly.c.agent_id == totals.c.agent_id
+            ).scalar_subquery().label("hourly_access_distribution")
         )
-        recent_accesses = recent_result.scalar() or 0
         
-        return {
-            "top_accessed_memories": top_accessed,
-            "hourly_access_distribution": hourly_distribution,
-            "recent_accesses_7d": recent_accesses,
-            "peak_access_hours": self._find_peak_hours(hourly_distribution)
+        patterns = {
+            agent_id: {
+                "top_accessed_memories": [],
+                "hourly_access_distribution": {},
+                "recent_accesses_7d": 0,
+                "peak_access_hours": []
+            }
+            for agent_id in agent_ids
         }
+        
+        connection = await session.connection()
+        async for row in await connection.stream(query):
+            # JSON object keys are strings; restore the integer hours
+            hourly_distribution = {
+                int(hour): count
+                for hour, count in sorted(
+                    (row.hourly_access_distribution or {}).items(), key=lambda item: int(item[0])
+                )
+            }
+            
+            patterns[row.agent_id] = {
+                "top_accessed_memories": row.top_accessed_memories or [],
+                "hourly_access_distribution": hourly_distribution,
+                "recent_accesses_7d": row.recent_accesses_7d or 0,
+                "peak_access_hours": self._find_peak_hours(hourly_distribution)
+            }
+        
+        return patterns
     
-    async def _get_performance_metrics(self, agent: Agent) -> Dict[str, Any]:
-        """Get performance-related metrics."""
+    async def _get_performance_metrics(self, agents: List[AgentSnapshot]) -> Dict[str, Dict[str, Any]]:
+        """Get performance-related metrics per agent."""
+        
+        # Scores are computed for all agents in one vectorized call
+        success_rates = np.array([agent.success_rate for agent in agents], dtype=np.float64)
+        health_scores = np.array([agent.health_score for agent in agents], dtype=np.float64)
+        response_times_ms = np.array(
+            [agent.average_response_time_ms or np.nan for agent in agents], dtype=np.float64
+        )
+        reliability, efficiency = _agent_scores(success_rates, health_scores, response_times_ms)
         
         return {
-            "average_response_time_ms": agent.average_response_time_ms,
-            "success_rate": agent.success_rate,
-            "health_score": agent.health_score,
-            "reliability_score": self._calculate_reliability(agent),
-            "efficiency_score": self._calculate_efficiency(agent)
+            agent.agent_id: {
+                "average_response_time_ms": agent.average_response_time_ms,
+                "success_rate": agent.success_rate,
+                "health_score": agent.health_score,
+                "reliability_score": float(reliability[i]),
+                "efficiency_score": float(efficiency[i])
+            }
+            for i, agent in enumerate(agents)
         }
     
-    async def _get_learning_stats(self, agent_id: str) -> Dict[str, Any]:
-        """Get learning and pattern statistics."""
-        
-        # Pattern count
-        pattern_result = await self.session.execute(
-            select(func.count(MemoryPattern.id))
-            .where(MemoryPattern.agent_id == agent_id)
-        )
-        total_patterns = pattern_result.scalar() or 0
+    async def _get_learning_stats(self, session: AsyncSession, agent_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get learning and pattern statistics per agent."""
+        
+        # Patterns from the last 30 days drive the learning velocity
+        velocity_cutoff = datetime.utcnow() - timedelta(days=30)
+        
+        base = select(
+            MemoryPattern.agent_id,
+            MemoryPattern.pattern_type,
+            MemoryPattern.confidence,
+            MemoryPattern.is_active,
+            MemoryPattern.created_at
+        ).where(_any_agent(MemoryPattern.agent_id, agent_ids)).cte("base")
+        
+        # Scalar aggregates share one pass over the rows
+        totals = select(
+            base.c.agent_id,
+            func.count().label("total_patterns"),
+            func.avg(base.c.confidence).label("average_pattern_confidence"),
+            func.count().filter(base.c.is_active.is_(True)).label("active_patterns"),
+            func.count().filter(base.c.created_at >= velocity_cutoff).label("recent_patterns")
+        ).group_by(base.c.agent_id).subquery("totals")
         
         # Pattern type distribution
-        pattern_type_result = await self.session.execute(
-            select(MemoryPattern.pattern_type, func.count(MemoryPattern.id))
-            .where(MemoryPattern.agent_id == agent_id)
-            .group_by(MemoryPattern.pattern_type)
-        )
-        pattern_types = {ptype: count for ptype, count in pattern_type_result}
-        
-        # Average pattern confidence
-        avg_confidence_result = await self.session.execute(
-            select(func.avg(MemoryPattern.confidence))
-            .where(MemoryPattern.agent_id == agent_id)
+        by_type = select(
+            base.c.agent_id,
+            base.c.pattern_type,
+            func.count().label("count")
+        ).group_by(base.c.agent_id, base.c.pattern_type).subquery("by_type")
+        
+        query = select(
+            totals,
+            select(func.json_object_agg(
+                by_type.c.pattern_type, by_type.c.count
+            )).where(
+                by_type.c.agent_id == totals.c.agent_id
+            ).scalar_subquery().label("pattern_type_distribution")
         )
-        avg_confidence = avg_confidence_result.scalar() or 0
         
-        return {
-            "total_patterns": total_patterns,
-            "pattern_type_distribution": pattern_types,
-            "average_pattern_confidence": float(avg_confidence) if avg_confidence else 0,
-            "active_patterns": await self._count_active_patterns(agent_id),
-            "learning_velocity": await self._calculate_learning_velocity(agent_id)
+        stats = {
+            agent_id: {
+                "total_patterns": 0,
+                "pattern_type_distribution": {},
+                "average_pattern_confidence": 0,
+                "active_patterns": 0,
+                "learning_velocity": 0.0
+            }
+            for agent_id in agent_ids
         }
-    
-    async def _get_time_series_data(self, agent_id: str, days: int = 30) -> Dict[str, Any]:
-        """Get time series data for the last N days."""
-        
-        cutoff = datetime.utcnow() - timedelta(days=days)
         
-        # Daily memory creation
-        daily_query = text("""
-            SELECT DATE(created_at) as date, COUNT(*) as count
-            FROM memories_v2
-            WHERE agent_id = :agent_id AND created_at >= :cutoff
-            GROUP BY date
-            ORDER BY date
-        """)
+        connection = await session.connection()
+        async for row in await connection.stream(query):
+            stats[row.agent_id] = {
+                "total_patterns": row.total_patterns or 0,
+                "pattern_type_distribution": row.pattern_type_distribution or {},
+                "average_pattern_confidence": float(row.average_pattern_confidence) if row.average_pattern_confidence else 0,
+                "active_patterns": row.active_patterns or 0,
+                "learning_velocity": (row.recent_patterns or 0) / 30.0
+            }
         
-        daily_result = await self.session.execute(
-            daily_query, 
-            {"agent_id": agent_id, "cutoff": cutoff}
+        return stats
+    
+    async def _get_time_series_data(self,
+                                    session: AsyncSession,
+                                    agent_ids: List[str],
+                                    days: int = 30) -> Dict[str, Dict[str, Any]]:
+        """Get time series data for the last N days per agent."""
+        
+        start_date = (datetime.utcnow() - timedelta(days=days)).date()
+        
+        # Daily memory creation, streamed in (agent_id, date) order
+        daily_dates: Dict[str, List[str]] = {agent_id: [] for agent_id in agent_ids}
+        daily_counts: Dict[str, List[int]] = {agent_id: [] for agent_id in agent_ids}
+        connection = await session.connection()
+        daily_result = await connection.stream(
+            _DAILY_MEMORY_QUERY,
+            {"agent_ids": agent_ids, "start_date": start_date}
         )
+        async for agent_id, date, count in daily_result:
+            daily_dates[agent_id].append(str(date))
+            daily_counts[agent_id].append(count)
+        
+        time_series = {}
+        for agent_id in agent_ids:
+            counts = np.array(daily_counts[agent_id], dtype=np.int64)
+            time_series[agent_id] = {
+                "daily_memory_creation": dict(zip(daily_dates[agent_id], counts.tolist())),
+                "trend": self._calculate_trend(counts)
+            }
         
-        daily_memories = {
-            str(date): count 
-            for date, count in daily_result
-        }
-        
-        return {
-            "daily_memory_creation": daily_memories,
-            "trend": self._calculate_trend(daily_memories)
-        }
+        return time_series
     
-    async def _get_collaboration_stats(self, agent_id: str) -> Dict[str, Any]:
-        """Get collaboration and sharing statistics."""
-        
-        # Memories shared by this agent
-        shared_by_query = text("""
-            SELECT COUNT(DISTINCT memory_id)
-            FROM memory_sharing
-            WHERE shared_by_agent_id = :agent_id
-        """)
-        
-        shared_by_result = await self.session.execute(shared_by_query, {"agent_id": agent_id})
-        memories_shared = shared_by_result.scalar() or 0
-        
-        # Memories shared with this agent
-        shared_with_query = text("""
-            SELECT COUNT(DISTINCT memory_id)
-            FROM memory_sharing
-            WHERE shared_with_agent_id = :agent_id
-        """)
-        
-        shared_with_result = await self.session.execute(shared_with_query, {"agent_id": agent_id})
-        memories_received = shared_with_result.scalar() or 0
-        
-        # Top collaborators
-        collaborator_query = text("""
-            SELECT shared_with_agent_id, COUNT(*) as count
-            FROM memory_sharing
-            WHERE shared_by_agent_id = :agent_id
-            GROUP BY shared_with_agent_id
-            ORDER BY count DESC
-            LIMIT 5
-        """)
-        
-        collaborator_result = await self.session.execute(collaborator_query, {"agent_id": agent_id})
-        top_collaborators = [
-            {"agent_id": agent, "shared_count": count}
-            for agent, count in collaborator_result
-        ]
+    async def _get_collaboration_stats(self,
+                                       session: AsyncSession,
+                                       agent_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get collaboration and sharing statistics per agent."""
+        
+        connection = await session.connection()
+        collaboration_result = await connection.execute(_COLLABORATION_QUERY, {"agent_ids": agent_ids})
+        rows = collaboration_result.all()
+        
+        shared = np.array([row.memories_shared for row in rows], dtype=np.float64)
+        received = np.array([row.memories_received for row in rows], dtype=np.float64)
+        scores = _collaboration_scores(shared, received)
         
         return {
-            "memories_shared": memories_shared,
-            "memories_received": memories_received,
-            "collaboration_score": self._calculate_collaboration_score(memories_shared, memories_received),
-            "top_collaborators": top_collaborators
+            row.agent_id: {
+                "memories_shared": row.memories_shared,
+                "memories_received": row.memories_received,
+                "collaboration_score": float(scores[i]),
+                "top_collaborators": row.top_collaborators or []
+            }
+            for i, row in enumerate(rows)
         }
     
     # Helper methods
@@ -337,92 +901,19 @@ class StatisticsService:
         if not hourly_distribution:
             return []
         
-        max_count = max(hourly_distribution.values())
-        threshold = max_count * 0.8  # Within 80% of peak
-        
-        return [
-            hour for hour, count in hourly_distribution.items()
-            if count >= threshold
-        ]
-    
-    def _calculate_reliability(self, agent: Agent) -> float:
-        """Calculate reliability score (0-1)."""
-        factors = [
-            agent.success_rate,
-            agent.health_score,
-            1.0 if agent.average_response_time_ms and agent.average_response_time_ms < 1000 else 0.5
-        ]
-        return sum(factors) / len(factors)
-    
-    def _calculate_efficiency(self, agent: Agent) -> float:
-        """Calculate efficiency score (0-1)."""
-        if not agent.average_response_time_ms:
-            return 0.5
-        
-        # Faster response = higher efficiency
-        if agent.average_response_time_ms < 100:
-            return 1.0
-        elif agent.average_response_time_ms < 500:
-            return 0.8
-        elif agent.average_response_time_ms < 1000:
-            return 0.6
-        else:
-            return 0.4
-    
-    async def _count_shared_memories(self, agent_id: str) -> int:
-        """Count memories shared by agent."""
-        result = await self.session.execute(
-            select(func.count(Memory.id))
-            .where(and_(
-                Memory.agent_id == agent_id,
-                Memory.access_level != 'private'
-            ))
-        )
-        return result.scalar() or 0
-    
-    async def _count_consolidated_memories(self, agent_id: str) -> int:
-        """Count consolidated memories."""
-        query = text("""
-            SELECT COUNT(DISTINCT consolidated_memory_id)
-            FROM memory_consolidations
-            WHERE agent_id = :agent_id
-        """)
-        result = await self.session.execute(query, {"agent_id": agent_id})
-        return result.scalar() or 0
-    
-    async def _count_active_patterns(self, agent_id: str) -> int:
-        """Count active patterns."""
-        result = await self.session.execute(
-            select(func.count(MemoryPattern.id))
-            .where(and_(
-                MemoryPattern.agent_id == agent_id,
-                MemoryPattern.is_active == True
-            ))
-        )
-        return result.scalar() or 0
-    
-    async def _calculate_learning_velocity(self, agent_id: str) -> float:
-        """Calculate learning velocity (patterns per day)."""
-        # Get patterns from last 30 days
-        cutoff = datetime.utcnow() - timedelta(days=30)
-        result = await self.session.execute(
-            select(func.count(MemoryPattern.id))
-            .where(and_(
-                MemoryPattern.agent_id == agent_id,
-                MemoryPattern.created_at >= cutoff
-            ))
-        )
-        pattern_count = result.scalar() or 0
-        return pattern_count / 30.0
+        hours = np.fromiter(hourly_distribution.keys(), dtype=np.int64, count=len(hourly_distribution))
+        counts = np.fromiter(hourly_distribution.values(), dtype=np.int64, count=len(hourly_distribution))
+        threshold = counts.max() * 0.8  # Within 80% of peak
+        
+        return hours[counts >= threshold].tolist()
     
-    def _calculate_trend(self, daily_data: Dict[str, int]) -> str:
-        """Calculate trend from daily data."""
-        if len(daily_data) < 7:
+    def _calculate_trend(self, values: np.ndarray) -> str:
+        """Calculate trend from dense daily counts (oldest first)."""
+        if len(values) < 7:
             return "insufficient_data"
         
-        values = list(daily_data.values())
-        recent_avg = sum(values[-7:]) / 7
-        previous_avg = sum(values[-14:-7]) / 7 if len(values) >= 14 else recent_avg
+        recent_avg = values[-7:].mean()
+        previous_avg = values[-14:-7].mean() if len(values) >= 14 else recent_avg
         
         if recent_avg > previous_avg * 1.1:
             return "increasing"
@@ -430,15 +921,3 @@ class StatisticsService:
             return "decreasing"
         else:
             return "stable"
-    
-    def _calculate_collaboration_score(self, shared: int, received: int) -> float:
-        """Calculate collaboration score (0-1)."""
-        if shared + received == 0:
-            return 0.0
-        
-        # Balance between sharing and receiving
-        balance = min(shared, received) / max(shared, received) if max(shared, received) > 0 else 0
-        # Activity level
-        activity = min((shared + received) / 100, 1.0)  # Cap at 100 for full score
-        
-        return (balance + activity) / 2
\ No newline at end of file
@@ -15,6 +15,7 @@ import numpy as np
 from ..models import Memory
 from ..core.exceptions import NotFoundError, ValidationError
 from ..core.unified_database import get_unified_db_manager
+from .semantic_cache import get_query_cache
 
 logger = logging.getLogger(__name__)
 
@@ -77,8 +78,9 @@ class UnifiedMemoryService:
             await session.commit()
             await session.refresh(memory)
             
-            # Cache the memory
+            # Cache the memory; cached searches may now be missing it
             self._cache_memory(memory)
+            get_query_cache().invalidate()
             
             logger.info(f"[{service_name}] Created memory {memory.id} with type {memory_type}")
             return memory
@@ -132,8 +134,9 @@ class UnifiedMemoryService:
             await session.commit()
             await session.refresh(memory)
             
-            # Invalidate cache
+            # Invalidate cache, including searches that may return the memory
             self._invalidate_cache(memory_id)
+            get_query_cache().invalidate()
             
             logger.info(f"[{service_name}] Updated memory {memory_id}")
             return memory
@@ -156,8 +159,9 @@ class UnifiedMemoryService:
             await session.delete(memory)
             await session.commit()
             
-            # Invalidate cache
+            # Invalidate cache, including searches that may return the memory
             self._invalidate_cache(memory_id)
+            get_query_cache().invalidate()
             
             logger.info(f"[{service_name}] Deleted memory {memory_id}")
             return True
@@ -332,6 +336,8 @@ class UnifiedMemoryService:
             await session.commit()
             
             deleted_count = len(memories_to_delete)
+            if deleted_count:
+                get_query_cache().invalidate()
             logger.info(f"[{service_name}] Cleaned up {deleted_count} old memories")
             
             return deleted_count
\ No newline at end of file
@@ -3,8 +3,10 @@ Vectorization Service for TMWS
 Handles text embedding generation using sentence-transformers
 """
 
+import asyncio
 import logging
-from typing import List, Union
+import threading
+from typing import Dict, List, Optional, Set, Union
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
@@ -19,6 +21,22 @@ class VectorizationService:
     
     _model = None
     _model_name = None
+    # Batches embed on worker threads, so concurrent first calls must not
+    # each load their own copy of the model
+    _model_lock = threading.Lock()
+    
+    # Single-text requests arriving within this many seconds are embedded
+    # together in one model call (or sooner, once a full batch is pending)
+    BATCH_WINDOW = 0.005
+    
+    # Pending single-text requests, shared by all instances like the model:
+    # text -> futures waiting for its embedding (duplicates share one slot).
+    # The futures and flush timer belong to _pending_loop; a request from
+    # any other loop starts the batch state afresh
+    _pending: Dict[str, List[asyncio.Future]] = {}
+    _pending_loop: Optional[asyncio.AbstractEventLoop] = None
+    _flush_handle: Optional[asyncio.TimerHandle] = None
+    _flush_tasks: Set[asyncio.Task] = set()
     
     @classmethod
     def get_model(cls) -> SentenceTransformer:
@@ -26,10 +44,12 @@ class VectorizationService:
         current_model = settings.embedding_model
         
         if cls._model is None or cls._model_name != current_model:
-            logger.info(f"Loading embedding model: {current_model}")
-            cls._model = SentenceTransformer(current_model)
-            cls._model_name = current_model
-            logger.info(f"Model loaded successfully: {current_model}")
+            with cls._model_lock:
+                if cls._model is None or cls._model_name != current_model:
+                    logger.info(f"Loading embedding model: {current_model}")
+                    model = SentenceTransformer(current_model)
+                    cls._model, cls._model_name = model, current_model
+                    logger.info(f"Model loaded successfully: {current_model}")
         
         return cls._model
     
@@ -46,29 +66,93 @@ class VectorizationService:
         Returns:
             Numpy array of embeddings
         """
-        model = self.get_model()
-        
-        # Convert single string to list for consistent processing
+        # Single texts are coalesced with concurrent requests
         if isinstance(text, str):
-            texts = [text]
-            single_input = True
-        else:
-            texts = text
-            single_input = False
+            return await self._enqueue(text)
         
         # Generate embeddings
-        embeddings = model.encode(
+        return await asyncio.to_thread(self._encode, text)
+    
+    @classmethod
+    def _encode(cls, texts: List[str]) -> np.ndarray:
+        """Embed texts with the model (blocking)."""
+        return cls.get_model().encode(
             texts,
             convert_to_numpy=True,
             show_progress_bar=False,
             batch_size=settings.max_embedding_batch_size
         )
+    
+    @classmethod
+    def _enqueue(cls, text: str) -> asyncio.Future:
+        """Queue a text for the next batched model call."""
+        loop = asyncio.get_running_loop()
+        if cls._pending_loop is not loop:
+            cls._reset_pending(loop)
+        future = loop.create_future()
+        cls._pending.setdefault(text, []).append(future)
+        
+        if len(cls._pending) >= settings.max_embedding_batch_size:
+            cls._flush()
+        elif cls._flush_handle is None:
+            cls._flush_handle = loop.call_later(cls.BATCH_WINDOW, cls._flush)
+        return future
+    
+    @classmethod
+    def _reset_pending(cls, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Bind the batch state to loop, dropping what another loop left behind.
         
-        # Return single embedding if single input
-        if single_input:
-            return embeddings[0]
+        A loop can stop with a flush still scheduled (e.g. asyncio.run()
+        returning after its caller was cancelled); its timer never fires
+        and its futures can't be resolved from this loop.
+        """
+        if cls._flush_handle is not None:
+            cls._flush_handle.cancel()
+        if cls._pending:
+            logger.warning(f"Dropping {len(cls._pending)} embedding requests left by a previous event loop")
+        cls._pending = {}
+        cls._flush_handle = None
+        cls._flush_tasks = set()
+        cls._pending_loop = loop
+    
+    @classmethod
+    def _flush(cls) -> None:
+        """Start embedding all pending texts."""
+        if cls._flush_handle is not None:
+            cls._flush_handle.cancel()
+            cls._flush_handle = None
+        
+        pending, cls._pending = cls._pending, {}
+        # Texts whose callers have all gone (e.g. cancelled) aren't embedded
+        pending = {
+            text: futures for text, futures in pending.items()
+            if not all(future.done() for future in futures)
+        }
+        if pending:
+            # The loop only holds weak references to tasks
+            task = asyncio.ensure_future(cls._embed_pending(pending))
+            cls._flush_tasks.add(task)
+            task.add_done_callback(cls._flush_tasks.discard)
+    
+    @classmethod
+    async def _embed_pending(cls, pending: Dict[str, List[asyncio.Future]]) -> None:
+        """Embed a batch of pending texts off the event loop and resolve their futures."""
+        texts = list(pending)
+        try:
+            embeddings = await asyncio.to_thread(cls._encode, texts)
+        except Exception as e:
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
         
-        return embeddings
+        for text, embedding in zip(texts, embeddings):
+            for i, future in enumerate(pending[text]):
+                if not future.done():
+                    # Duplicate requests each get their own array
+                    future.set_result(embedding if i == 0 else embedding.copy())
     
     async def vectorize_batch(
         self,
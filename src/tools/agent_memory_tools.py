@@ -3,19 +3,120 @@ MCP tools for agent memory management in TMWS v2.0.
 These tools allow external agents to interact with the memory system via MCP protocol.
 """
 
-from typing import Dict, Any, List, Optional
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from uuid import UUID
 
 from fastmcp import Tool
 
+from ..services.semantic_cache import SemanticQueryCache, get_query_cache
+from ..services.vectorization_service import VectorizationService
+
+logger = logging.getLogger(__name__)
+
+# Agent ID format accepted by the agent registry, compiled once
+_AGENT_ID_RE = re.compile(r'[a-zA-Z0-9][a-zA-Z0-9\-_\.]{2,63}')
+
+# Tool input schemas are static, so they are built once and shared
+_MEMORY_CREATE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "agent_id": {"type": "string", "description": "Agent identifier"},
+        "content": {"type": "string", "description": "Memory content"},
+        "namespace": {"type": "string", "default": "default"},
+        "access_level": {"type": "string", "enum": ["private", "team", "shared", "public"]},
+        "tags": {"type": "array", "items": {"type": "string"}},
+        "context": {"type": "object"},
+        "importance": {"type": "number", "minimum": 0, "maximum": 1}
+    },
+    "required": ["agent_id", "content"]
+}
+
+_MEMORY_SEARCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "agent_id": {"type": "string", "description": "Agent identifier"},
+        "query": {"type": "string", "description": "Search query"},
+        "namespace": {"type": "string", "default": "default"},
+        "limit": {"type": "integer", "default": 10},
+        "include_shared": {"type": "boolean", "default": True},
+        "min_importance": {"type": "number", "minimum": 0, "maximum": 1}
+    },
+    "required": ["agent_id", "query"]
+}
+
+_MEMORY_SHARE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "agent_id": {"type": "string", "description": "Owner agent identifier"},
+        "memory_id": {"type": "string", "description": "Memory ID to share"},
+        "share_with_agents": {"type": "array", "items": {"type": "string"}},
+        "permission": {"type": "string", "enum": ["read", "write", "delete"]}
+    },
+    "required": ["agent_id", "memory_id", "share_with_agents"]
+}
+
+_MEMORY_CONSOLIDATE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "agent_id": {"type": "string", "description": "Agent identifier"},
+        "memory_ids": {"type": "array", "items": {"type": "string"}},
+        "consolidation_type": {"type": "string", "enum": ["summary", "merge", "compress"]},
+        "namespace": {"type": "string", "default": "default"}
+    },
+    "required": ["agent_id", "memory_ids"]
+}
+
+_MEMORY_PATTERNS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "agent_id": {"type": "string", "description": "Agent identifier"},
+        "pattern_type": {"type": "string", "enum": ["sequence", "correlation", "cluster"]},
+        "namespace": {"type": "string", "default": "default"},
+        "min_confidence": {"type": "number", "minimum": 0, "maximum": 1}
+    },
+    "required": ["agent_id"]
+}
+
 
 class AgentMemoryTools:
     """MCP tools for agent memory operations."""
     
-    def __init__(self, memory_service, auth_service):
+    # Seconds a completed consolidation is replayed for identical requests
+    CONSOLIDATION_RESULT_TTL = 300.0
+    
+    # A similar search with the same scope within this many seconds of a
+    # cache hit is taken as a sign the cached results were not what the
+    # agent wanted
+    SEARCH_RETRY_WINDOW = 30.0
+    
+    def __init__(self,
+                 memory_service,
+                 auth_service,
+                 vectorization_service: Optional[VectorizationService] = None,
+                 query_cache: Optional[SemanticQueryCache] = None,
+                 vector_search: bool = False):
         self.memory_service = memory_service
         self.auth_service = auth_service
+        self.vectorization_service = vectorization_service or VectorizationService()
+        self.query_cache = query_cache or get_query_cache()
+        # Whether memory_service.search_memories ranks by a precomputed
+        # query_embedding. Only then can near-duplicate queries share cached
+        # results; text searches are cached by their exact query text
+        self.vector_search = vector_search
+        self._tools: Optional[List[Tool]] = None
+        # Identical concurrent consolidations share one run; results are
+        # kept briefly so retries don't consolidate again
+        self._consolidations: Dict[str, asyncio.Task] = {}
+        self._consolidation_results: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        # scope -> (query embedding, similarity, served_at) of the last cache
+        # hit awaiting relevance feedback, oldest first
+        self._served_hits: Dict[Tuple[Any, ...], Tuple[Any, float, float]] = {}
     
     async def create_memory_tool(
         self,
@@ -48,10 +149,11 @@ class AgentMemoryTools:
             context=context or {},
             importance_score=importance
         )
+        self._invalidate_searches([agent_id], access_level)
         
         return {
             "success": True,
-            "memory_id": str(memory.id),
+            "memory_id": memory.id_str,
             "message": "Memory created successfully"
         }
     
@@ -78,42 +180,96 @@ class AgentMemoryTools:
         if not await self._validate_agent(agent_id, namespace):
             return {"error": "Invalid agent credentials"}
         
+        scope = (agent_id, namespace, limit, include_shared, min_importance)
+        query_embedding = None
+        if self.vector_search:
+            # Near-duplicate queries with the same scope are served from cache
+            try:
+                query_embedding = await self.vectorization_service.vectorize_text(query)
+            except Exception as e:
+                logger.warning(f"Query embedding failed, searching uncached: {e}")
+            
+            # The previous cache hit in this scope was relevant unless the agent
+            # soon searches again for something similar; an unrelated search
+            # soon after says nothing about it
+            now = time.monotonic()
+            self._expire_served_hits(now)
+            served = self._served_hits.pop(scope, None)
+            if served is not None and query_embedding is not None:
+                served_embedding, similarity, _ = served
+                if self.query_cache.similarity(query_embedding, served_embedding) >= self.query_cache.threshold:
+                    self.query_cache.record_feedback(namespace, similarity, relevant=False)
+            
+            if query_embedding is not None:
+                match = self.query_cache.match(query_embedding, scope, partition=namespace)
+                if match is not None:
+                    cached, similarity = match
+                    self._served_hits[scope] = (query_embedding, similarity, now)
+                    return self._cached_search_response(cached)
+        else:
+            # Text search is case-insensitive, so only the case is normalized
+            cached = self.query_cache.get_exact(query.lower(), scope)
+            if cached is not None:
+                return self._cached_search_response(cached)
+        
         # Search memories with access control
+        search_options = {"query_embedding": query_embedding} if query_embedding is not None else {}
         results = await self.memory_service.search_memories(
             query=query,
             agent_id=agent_id,
             namespace=namespace,
             limit=limit,
             include_shared=include_shared,
-            min_importance=min_importance
+            min_importance=min_importance,
+            **search_options
         )
         
         # Filter based on access permissions
-        accessible_results = []
-        for memory in results:
-            if self.auth_service.check_memory_access(
-                agent_id=agent_id,
-                agent_namespace=namespace,
-                memory_agent_id=memory.agent_id,
-                memory_namespace=memory.namespace,
-                memory_access_level=memory.access_level,
-                shared_agents=memory.shared_with_agents
-            ):
-                accessible_results.append({
-                    "id": str(memory.id),
-                    "content": memory.content,
-                    "summary": memory.summary,
-                    "agent_id": memory.agent_id,
-                    "importance": memory.importance_score,
-                    "relevance": memory.relevance_score,
-                    "tags": memory.tags,
-                    "created_at": memory.created_at.isoformat() if memory.created_at else None
-                })
+        allowed = self.auth_service.check_memory_access_batch(agent_id, namespace, results)
+        accessible_results = [
+            {
+                "id": memory.id_str,
+                "content": memory.content,
+                "summary": memory.summary,
+                "agent_id": memory.agent_id,
+                "importance": memory.importance_score,
+                "relevance": memory.relevance_score,
+                "tags": memory.tags,
+                "created_at": memory.created_at_iso
+            }
+            for memory, is_allowed in zip(results, allowed)
+            if is_allowed
+        ]
+        
+        if query_embedding is not None:
+            self.query_cache.set(query_embedding, scope, accessible_results)
+        elif not self.vector_search:
+            self.query_cache.set_exact(query.lower(), scope, accessible_results)
         
         return {
             "success": True,
             "count": len(accessible_results),
-            "memories": accessible_results
+            "memories": [dict(memory) for memory in accessible_results]
+        }
+    
+    def _expire_served_hits(self, now: float) -> None:
+        """Record cache hits not retried within SEARCH_RETRY_WINDOW as relevant and forget them."""
+        # Hits are stored in the order they were served
+        while self._served_hits:
+            scope, (_, similarity, served_at) = next(iter(self._served_hits.items()))
+            if now - served_at <= self.SEARCH_RETRY_WINDOW:
+                break
+            del self._served_hits[scope]
+            self.query_cache.record_feedback(scope[1], similarity, relevant=True)
+    
+    @staticmethod
+    def _cached_search_response(cached: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build a search response from cached results, copied so callers can't alter the cache."""
+        return {
+            "success": True,
+            "count": len(cached),
+            "memories": [dict(memory) for memory in cached],
+            "cached": True
         }
     
     async def share_memory_tool(
@@ -144,6 +300,7 @@ class AgentMemoryTools:
             shared_with_agents=share_with_agents,
             permission=permission
         )
+        self._invalidate_searches(share_with_agents)
         
         return {
             "success": True,
@@ -170,23 +327,59 @@ class AgentMemoryTools:
         if not await self._validate_agent(agent_id, namespace):
             return {"error": "Invalid agent credentials"}
         
-        # Check access to all memories
-        memories = []
-        for mem_id in memory_ids:
-            memory = await self.memory_service.get_memory(mem_id)
-            if not memory:
-                continue
-                
-            # Check access
-            if self.auth_service.check_memory_access(
-                agent_id=agent_id,
-                agent_namespace=namespace,
-                memory_agent_id=memory.agent_id,
-                memory_namespace=memory.namespace,
-                memory_access_level=memory.access_level,
-                shared_agents=memory.shared_with_agents
-            ):
-                memories.append(memory)
+        key = hashlib.blake2b(
+            "|".join([agent_id, namespace, consolidation_type, *sorted(memory_ids)]).encode(),
+            digest_size=16
+        ).hexdigest()
+        
+        now = time.monotonic()
+        cached = self._consolidation_results.get(key)
+        if cached is not None:
+            if cached[0] > now:
+                return cached[1]
+            del self._consolidation_results[key]
+        
+        task = self._consolidations.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._consolidate(agent_id, memory_ids, consolidation_type, namespace)
+            )
+            self._consolidations[key] = task
+            task.add_done_callback(lambda done: self._finish_consolidation(key, done))
+        
+        # Shielded so one caller's cancellation doesn't cancel the shared run
+        return await asyncio.shield(task)
+    
+    def _finish_consolidation(self, key: str, task: asyncio.Task) -> None:
+        """Release a finished consolidation run and keep its successful result."""
+        self._consolidations.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+        
+        result = task.result()
+        if result.get("success"):
+            now = time.monotonic()
+            for expired in [k for k, (expires, _) in self._consolidation_results.items() if expires <= now]:
+                del self._consolidation_results[expired]
+            self._consolidation_results[key] = (now + self.CONSOLIDATION_RESULT_TTL, result)
+    
+    async def _consolidate(
+        self,
+        agent_id: str,
+        memory_ids: List[str],
+        consolidation_type: str,
+        namespace: str
+    ) -> Dict[str, Any]:
+        """Consolidate the accessible memories among memory_ids."""
+        
+        # Fetch all memories in one round-trip, then check access to them
+        try:
+            found = await self.memory_service.get_memories_bulk(memory_ids)
+        except ValueError:
+            return {"error": "Invalid memory ID"}
+        
+        allowed = self.auth_service.check_memory_access_batch(agent_id, namespace, found)
+        memories = [memory for memory, is_allowed in zip(found, allowed) if is_allowed]
         
         if len(memories) < 2:
             return {"error": "Need at least 2 accessible memories to consolidate"}
@@ -197,6 +390,7 @@ class AgentMemoryTools:
             memories=memories,
             consolidation_type=consolidation_type
         )
+        self._invalidate_searches([agent_id], getattr(consolidated, "access_level", None))
         
         return {
             "success": True,
@@ -250,93 +444,63 @@ class AgentMemoryTools:
             "patterns": pattern_list
         }
     
+    def _invalidate_searches(self, agent_ids: List[str], access_level: Optional[str] = "private") -> None:
+        """
+        Drop cached searches that a memory write may have changed.
+        
+        Private and shared memories only appear in the given agents'
+        searches; any other (or unknown) access level can appear in anyone's.
+        """
+        level = getattr(access_level, "value", access_level)
+        if level in ("private", "shared"):
+            agents = set(agent_ids)
+            self.query_cache.invalidate(lambda scope: scope[0] in agents)
+        else:
+            self.query_cache.invalidate()
+    
     async def _validate_agent(self, agent_id: str, namespace: str) -> bool:
         """Validate agent exists and is active."""
         # In production, this would check against database
-        # For now, simple validation
-        return bool(agent_id and namespace)
+        # For now, format validation only
+        return bool(namespace) and bool(agent_id) and _AGENT_ID_RE.fullmatch(agent_id) is not None
     
     def register_tools(self) -> List[Tool]:
-        """Register all MCP tools."""
+        """Register all MCP tools; built on first call and reused afterwards."""
+        if self._tools is None:
+            self._tools = self._build_tools()
+        return self._tools
+    
+    def _build_tools(self) -> List[Tool]:
+        """Build the MCP tool definitions bound to this instance."""
         return [
             Tool(
                 name="memory_create",
                 description="Create a new memory",
-                input_schema={
-                    "type": "object",
-                    "properties": {
-                        "agent_id": {"type": "string", "description": "Agent identifier"},
-                        "content": {"type": "string", "description": "Memory content"},
-                        "namespace": {"type": "string", "default": "default"},
-                        "access_level": {"type": "string", "enum": ["private", "team", "shared", "public"]},
-                        "tags": {"type": "array", "items": {"type": "string"}},
-                        "context": {"type": "object"},
-                        "importance": {"type": "number", "minimum": 0, "maximum": 1}
-                    },
-                    "required": ["agent_id", "content"]
-                },
+                input_schema=_MEMORY_CREATE_SCHEMA,
                 func=self.create_memory_tool
             ),
             Tool(
                 name="memory_search",
                 description="Search memories using semantic search",
-                input_schema={
-                    "type": "object",
-                    "properties": {
-                        "agent_id": {"type": "string", "description": "Agent identifier"},
-                        "query": {"type": "string", "description": "Search query"},
-                        "namespace": {"type": "string", "default": "default"},
-                        "limit": {"type": "integer", "default": 10},
-                        "include_shared": {"type": "boolean", "default": True},
-                        "min_importance": {"type": "number", "minimum": 0, "maximum": 1}
-                    },
-                    "required": ["agent_id", "query"]
-                },
+                input_schema=_MEMORY_SEARCH_SCHEMA,
                 func=self.search_memories_tool
             ),
             Tool(
                 name="memory_share",
                 description="Share a memory with other agents",
-                input_schema={
-                    "type": "object",
-                    "properties": {
-                        "agent_id": {"type": "string", "description": "Owner agent identifier"},
-                        "memory_id": {"type": "string", "description": "Memory ID to share"},
-                        "share_with_agents": {"type": "array", "items": {"type": "string"}},
-                        "permission": {"type": "string", "enum": ["read", "write", "delete"]}
-                    },
-                    "required": ["agent_id", "memory_id", "share_with_agents"]
-                },
+                input_schema=_MEMORY_SHARE_SCHEMA,
                 func=self.share_memory_tool
             ),
             Tool(
                 name="memory_consolidate",
                 description="Consolidate multiple memories",
-                input_schema={
-                    "type": "object",
-                    "properties": {
-                        "agent_id": {"type": "string", "description": "Agent identifier"},
-                        "memory_ids": {"type": "array", "items": {"type": "string"}},
-                        "consolidation_type": {"type": "string", "enum": ["summary", "merge", "compress"]},
-                        "namespace": {"type": "string", "default": "default"}
-                    },
-                    "required": ["agent_id", "memory_ids"]
-                },
+                input_schema=_MEMORY_CONSOLIDATE_SCHEMA,
                 func=self.consolidate_memories_tool
             ),
             Tool(
                 name="memory_patterns",
                 description="Get learning patterns from memories",
-                input_schema={
-                    "type": "object",
-                    "properties": {
-                        "agent_id": {"type": "string", "description": "Agent identifier"},
-                        "pattern_type": {"type": "string", "enum": ["sequence", "correlation", "cluster"]},
-                        "namespace": {"type": "string", "default": "default"},
-                        "min_confidence": {"type": "number", "minimum": 0, "maximum": 1}
-                    },
-                    "required": ["agent_id"]
-                },
+                input_schema=_MEMORY_PATTERNS_SCHEMA,
                 func=self.get_memory_patterns_tool
             )
         ]
\ No newline at end of file
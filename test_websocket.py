@@ -5,10 +5,41 @@ Test WebSocket MCP Connection
 
 import asyncio
 import json
+import os
+import statistics
+import time
 import websockets
 import uuid
 from datetime import datetime
 
+# Full responses are only pretty-printed when TMWS_WS_VERBOSE is set
+VERBOSE = bool(os.getenv("TMWS_WS_VERBOSE"))
+
+# Clients opened by the multiple connection test, and how many at once
+CLIENT_COUNT = int(os.getenv("TMWS_WS_CLIENTS", "100"))
+CLIENT_CONCURRENCY = int(os.getenv("TMWS_WS_CONCURRENCY", "20"))
+
+# Pre-serialized messages; the server reads text frames, so these stay str.
+# The client template is filled with (request id, client id, client id).
+_INITIALIZED_MESSAGE = json.dumps({"jsonrpc": "2.0", "method": "initialized"})
+_CLIENT_INIT_TEMPLATE = (
+    '{"jsonrpc": "2.0", "id": %d, "method": "initialize", "params": '
+    '{"protocolVersion": "2024-11-05", '
+    '"clientInfo": {"name": "Test Client %d", "version": "1.0.0"}, '
+    '"agent_id": "test-agent-%d", "namespace": "test"}}'
+)
+
+
+def _dump(response_data) -> str:
+    """Format a response for printing, in full only when verbose."""
+    if VERBOSE:
+        return json.dumps(response_data, indent=2)
+    if not isinstance(response_data, dict):
+        return "no response"
+    if "error" in response_data:
+        return f"error: {response_data['error'].get('message')}"
+    return "ok (set TMWS_WS_VERBOSE=1 for the full response)"
+
 
 async def test_mcp_connection():
     """Test MCP protocol over WebSocket."""
@@ -41,14 +72,10 @@ async def test_mcp_connection():
             
             response = await websocket.recv()
             response_data = json.loads(response)
-            print(f"Response: {json.dumps(response_data, indent=2)}")
+            print(f"Response: {_dump(response_data)}")
             
             # Send initialized confirmation
-            initialized_msg = {
-                "jsonrpc": "2.0",
-                "method": "initialized"
-            }
-            await websocket.send(json.dumps(initialized_msg))
+            await websocket.send(_INITIALIZED_MESSAGE)
             print("\n2. Sent initialized confirmation")
             
             # List available tools
@@ -59,13 +86,6 @@ async def test_mcp_connection():
                 "params": {}
             }
             
-            print("\n3. Listing available tools...")
-            await websocket.send(json.dumps(list_tools_request))
-            
-            response = await websocket.recv()
-            response_data = json.loads(response)
-            print(f"Available tools: {json.dumps(response_data, indent=2)}")
-            
             # Test creating a memory
             create_memory_request = {
                 "jsonrpc": "2.0",
@@ -81,13 +101,6 @@ async def test_mcp_connection():
                 }
             }
             
-            print("\n4. Creating a test memory...")
-            await websocket.send(json.dumps(create_memory_request))
-            
-            response = await websocket.recv()
-            response_data = json.loads(response)
-            print(f"Memory creation response: {json.dumps(response_data, indent=2)}")
-            
             # Test searching memories
             search_request = {
                 "jsonrpc": "2.0",
@@ -102,13 +115,6 @@ async def test_mcp_connection():
                 }
             }
             
-            print("\n5. Searching for memories...")
-            await websocket.send(json.dumps(search_request))
-            
-            response = await websocket.recv()
-            response_data = json.loads(response)
-            print(f"Search results: {json.dumps(response_data, indent=2)}")
-            
             # Test ping
             ping_request = {
                 "jsonrpc": "2.0",
@@ -117,12 +123,27 @@ async def test_mcp_connection():
                 "params": {}
             }
             
-            print("\n6. Sending ping...")
-            await websocket.send(json.dumps(ping_request))
+            # The server handles a connection's messages in order, so the
+            # requests are pipelined and the responses matched up by id
+            pipelined = [
+                ("3. Listing available tools...", "Available tools", list_tools_request),
+                ("4. Creating a test memory...", "Memory creation response", create_memory_request),
+                ("5. Searching for memories...", "Search results", search_request),
+                ("6. Sending ping...", "Ping response", ping_request)
+            ]
             
-            response = await websocket.recv()
-            response_data = json.loads(response)
-            print(f"Ping response: {json.dumps(response_data, indent=2)}")
+            print("\nSending requests 3-6 pipelined...")
+            for _, _, request in pipelined:
+                await websocket.send(json.dumps(request))
+            
+            responses = {}
+            for _ in pipelined:
+                response_data = json.loads(await websocket.recv())
+                responses[response_data.get("id")] = response_data
+            
+            for step, label, request in pipelined:
+                print(f"\n{step}")
+                print(f"{label}: {_dump(responses.get(request['id']))}")
             
             print("\n✅ All tests passed successfully!")
             
@@ -141,53 +162,55 @@ async def test_multiple_connections():
     print("Testing multiple simultaneous connections...")
     print("="*50)
     
+    semaphore = asyncio.Semaphore(CLIENT_CONCURRENCY)
+    
     async def create_client(client_id: int):
-        """Create and test a client connection."""
-        try:
-            async with websockets.connect(uri) as websocket:
-                print(f"\nClient {client_id}: Connected")
-                
-                # Initialize
-                init_request = {
-                    "jsonrpc": "2.0",
-                    "id": client_id * 100 + 1,
-                    "method": "initialize",
-                    "params": {
-                        "protocolVersion": "2024-11-05",
-                        "clientInfo": {
-                            "name": f"Test Client {client_id}",
-                            "version": "1.0.0"
-                        },
-                        "agent_id": f"test-agent-{client_id}",
-                        "namespace": "test"
-                    }
-                }
-                
-                await websocket.send(json.dumps(init_request))
-                response = await websocket.recv()
-                response_data = json.loads(response)
-                
-                if "result" in response_data:
-                    print(f"Client {client_id}: Initialized successfully")
-                    return True
-                else:
-                    print(f"Client {client_id}: Initialization failed")
-                    return False
+        """Create and test a client connection, returning its elapsed seconds or None."""
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                async with websockets.connect(uri) as websocket:
+                    if VERBOSE:
+                        print(f"\nClient {client_id}: Connected")
+                    
+                    # Initialize
+                    await websocket.send(
+                        _CLIENT_INIT_TEMPLATE % (client_id * 100 + 1, client_id, client_id)
+                    )
+                    response = await websocket.recv()
+                    response_data = json.loads(response)
                     
-        except Exception as e:
-            print(f"Client {client_id}: Error - {e}")
-            return False
+                    if "result" in response_data:
+                        if VERBOSE:
+                            print(f"Client {client_id}: Initialized successfully")
+                        return time.perf_counter() - started
+                    else:
+                        print(f"Client {client_id}: Initialization failed")
+                        return None
+                        
+            except Exception as e:
+                print(f"Client {client_id}: Error - {e}")
+                return None
     
-    # Create multiple clients concurrently
-    tasks = [create_client(i) for i in range(1, 4)]
+    # Create the clients concurrently, CLIENT_CONCURRENCY at a time
+    print(f"Opening {CLIENT_COUNT} clients, {CLIENT_CONCURRENCY} at a time...")
+    tasks = [create_client(i) for i in range(1, CLIENT_COUNT + 1)]
     results = await asyncio.gather(*tasks)
     
-    if all(results):
+    timings = [elapsed for elapsed in results if elapsed is not None]
+    print(f"\n{len(timings)}/{CLIENT_COUNT} clients initialized")
+    if len(timings) >= 2:
+        percentiles = statistics.quantiles(timings, n=100)
+        print(f"Connect + initialize: p50 {percentiles[49] * 1000:.1f} ms, "
+              f"p95 {percentiles[94] * 1000:.1f} ms")
+    
+    passed = len(timings) == CLIENT_COUNT
+    if passed:
         print("\n✅ Multiple connection test passed!")
     else:
         print("\n❌ Multiple connection test failed!")
     
-    return all(results)
+    return passed
 
 
 async def main():
@@ -0,0 +1,67 @@
+"""
+Tests for agent memory access checks.
+"""
+
+from itertools import product
+from types import SimpleNamespace
+
+import pytest
+
+from src.models.agent import AccessLevel
+from src.security import agent_auth
+from src.security.agent_auth import AgentAuthService
+
+
+@pytest.fixture
+def auth_service(monkeypatch):
+    monkeypatch.setattr(agent_auth, "settings", SimpleNamespace(TMWS_SECRET_KEY="test-secret-key"))
+    return AgentAuthService()
+
+
+def test_batch_access_check_matches_single_checks(auth_service):
+    memories = [
+        SimpleNamespace(
+            agent_id=owner,
+            namespace=namespace,
+            access_level=access_level,
+            shared_with_agents=shared_agents
+        )
+        for owner, namespace, access_level, shared_agents in product(
+            ("athena-conductor", "artemis-optimizer"),
+            ("default", "other"),
+            list(AccessLevel),
+            (None, [], ["athena-conductor"], ["hestia-auditor"])
+        )
+    ]
+
+    allowed = auth_service.check_memory_access_batch("athena-conductor", "default", memories)
+
+    expected = [
+        bool(auth_service.check_memory_access(
+            "athena-conductor",
+            "default",
+            memory.agent_id,
+            memory.namespace,
+            memory.access_level,
+            memory.shared_with_agents
+        ))
+        for memory in memories
+    ]
+    assert allowed.tolist() == expected
+    assert any(expected) and not all(expected)
+
+
+def test_batch_access_check_accepts_raw_access_level_values(auth_service):
+    memory = SimpleNamespace(
+        agent_id="artemis-optimizer",
+        namespace="default",
+        access_level=AccessLevel.TEAM.value,
+        shared_with_agents=None
+    )
+
+    assert auth_service.check_memory_access_batch("athena-conductor", "default", [memory]).tolist() == [True]
+    assert auth_service.check_memory_access_batch("athena-conductor", "other", [memory]).tolist() == [False]
+
+
+def test_batch_access_check_with_no_memories(auth_service):
+    assert auth_service.check_memory_access_batch("athena-conductor", "default", []).size == 0
@@ -0,0 +1,30 @@
+"""
+Tests for agent lookups in the agent context manager.
+"""
+
+import pytest
+
+from tmws.agent_context_manager import AgentContextManager
+
+
+@pytest.fixture
+def manager():
+    return AgentContextManager()
+
+
+def test_agent_by_full_id_is_read_only(manager):
+    info = manager.get_agent_by_full_id("athena-conductor")
+
+    assert info["short_name"] == "athena"
+    with pytest.raises(TypeError):
+        info["namespace"] = "tampered"
+    assert manager.get_agent_by_full_id("athena-conductor")["namespace"] == "trinitas"
+
+
+def test_agent_by_full_id_includes_custom_agents(manager):
+    manager.register_custom_agent("scout", "scout-explorer", ["search"])
+
+    info = manager.get_agent_by_full_id("scout-explorer")
+
+    assert info["short_name"] == "scout"
+    assert manager.get_agent_by_full_id("unknown-agent") is None
@@ -0,0 +1,85 @@
+"""
+Tests for the learning service's in-process pattern cache.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from src.services import learning_service
+from src.services.learning_service import LearningService
+
+
+@pytest.fixture
+def service():
+    service = LearningService()
+    service._cache_max_size = 3
+    return service
+
+
+def _key(service, name):
+    return service._cache_key("search_patterns", query=name)
+
+
+def test_least_frequently_used_entry_is_evicted(service):
+    hot, warm, cold = (_key(service, name) for name in ("hot", "warm", "cold"))
+    for key in (hot, warm, cold):
+        service._set_cache(key, key[1])
+    for _ in range(3):
+        service._get_cached(hot)
+    service._get_cached(warm)
+
+    new = _key(service, "new")
+    service._set_cache(new, "new")
+
+    assert set(service._cache) == {hot, warm, new}
+    assert service._cache_stats["evictions"] == 1
+
+
+def test_expired_entries_are_evicted_before_used_ones(service):
+    now = 1000.0
+    with patch.object(learning_service.time, "monotonic", lambda: now):
+        short, hot, warm = (_key(service, name) for name in ("short", "hot", "warm"))
+        service._set_cache(short, "short", ttl=1)
+        service._set_cache(hot, "hot", ttl=60)
+        service._set_cache(warm, "warm", ttl=60)
+        service._get_cached(short)
+        service._get_cached(hot)
+
+        now += 5
+        new = _key(service, "new")
+        service._set_cache(new, "new")
+
+    assert set(service._cache) == {hot, warm, new}
+
+
+def test_new_entries_age_in_after_evictions(service):
+    old_hot = [_key(service, f"old-{i}") for i in range(3)]
+    for key in old_hot:
+        service._set_cache(key, "old")
+        for _ in range(5):
+            service._get_cached(key)
+
+    # Each insert evicts one long-lived entry and raises the cache age to its
+    # priority, so the newcomers start level with what is left
+    newcomers = [_key(service, f"new-{i}") for i in range(3)]
+    for key in newcomers:
+        service._set_cache(key, "new")
+
+    assert newcomers[1] in service._cache
+    assert newcomers[2] in service._cache
+
+
+def test_eviction_heaps_stay_bounded(service):
+    keys = [_key(service, f"q{i}") for i in range(3)]
+    for key in keys:
+        service._set_cache(key, "data")
+    for _ in range(1000):
+        for key in keys:
+            service._get_cached(key)
+    for i in range(1000):
+        service._set_cache(_key(service, f"churn-{i}"), "data")
+
+    assert len(service._cache) == 3
+    assert len(service._cache_lfu_heap) <= 2 * len(service._cache) + 64
+    assert len(service._cache_expiry_heap) <= 2 * len(service._cache) + 64
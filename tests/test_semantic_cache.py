@@ -0,0 +1,363 @@
+"""
+Tests for the semantic query cache and its invalidation by memory writes.
+"""
+
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from sqlalchemy import column
+
+from src.services import memory_service as memory_service_module
+from src.services import semantic_cache
+from src.services.memory_service import MemoryService
+from src.services.semantic_cache import SemanticQueryCache, get_query_cache
+from src.services.unified_memory_service import UnifiedMemoryService
+from src.tools.agent_memory_tools import AgentMemoryTools
+
+
+def _memory(memory_id, content):
+    return SimpleNamespace(
+        id=memory_id,
+        id_str=str(memory_id),
+        content=content,
+        summary=None,
+        agent_id="athena-conductor",
+        importance_score=0.5,
+        relevance_score=0.9,
+        tags=[],
+        created_at_iso="2026-01-01T00:00:00"
+    )
+
+
+@pytest.fixture
+def query_cache():
+    return SemanticQueryCache(seed=0)
+
+
+@pytest.fixture
+def search_tools(query_cache):
+    """Agent memory tools over a store holding one public memory."""
+    memory_id = uuid4()
+    store = {memory_id: _memory(memory_id, "deploy checklist")}
+
+    memory_service = MagicMock()
+    memory_service.search_memories = AsyncMock(side_effect=lambda **_: list(store.values()))
+    auth_service = MagicMock()
+    auth_service.check_memory_access_batch = lambda agent_id, namespace, memories: [True] * len(memories)
+    vectorization_service = MagicMock()
+    vectorization_service.vectorize_text = AsyncMock(return_value=np.ones(8, dtype=np.float32))
+
+    tools = AgentMemoryTools(memory_service, auth_service, vectorization_service, query_cache)
+    return tools, memory_service, store, memory_id
+
+
+async def _search(tools):
+    return await tools.search_memories_tool(agent_id="artemis-optimizer", query="deploy checklist")
+
+
+@pytest.mark.parametrize("operation", ["create", "update", "delete"])
+async def test_memory_write_is_not_served_from_cache(search_tools, query_cache, operation, monkeypatch):
+    tools, memory_service, store, memory_id = search_tools
+
+    first = await _search(tools)
+    assert first["count"] == 1
+    assert (await _search(tools)).get("cached") is True
+
+    service = MemoryService(AsyncMock(), query_cache=query_cache)
+    service.get_memory = AsyncMock(return_value=store[memory_id])
+    if operation == "create":
+        new_id = uuid4()
+        store[new_id] = _memory(new_id, "deploy checklist v2")
+        monkeypatch.setattr(memory_service_module, "Memory", MagicMock())
+        await service.create_memory(content="deploy checklist v2")
+    elif operation == "update":
+        store[memory_id] = _memory(memory_id, "rotated checklist")
+        await service.update_memory(memory_id, {"content": "rotated checklist"})
+    else:
+        del store[memory_id]
+        await service.delete_memory(memory_id)
+
+    after = await _search(tools)
+    assert "cached" not in after
+    assert memory_service.search_memories.await_count == 2
+    if operation == "create":
+        assert after["count"] == 2
+    elif operation == "update":
+        assert after["memories"][0]["content"] == "rotated checklist"
+    else:
+        assert after["count"] == 0
+
+
+async def test_unified_cleanup_invalidates_searches_once(monkeypatch):
+    memories = [_memory(uuid4(), f"stale {i}") for i in range(5)]
+    session = AsyncMock()
+    session.execute.return_value = MagicMock(**{"scalars.return_value.all.return_value": memories})
+
+    @asynccontextmanager
+    async def get_session(name):
+        yield session
+
+    cache = MagicMock()
+    monkeypatch.setattr("src.services.unified_memory_service.get_query_cache", lambda: cache)
+    monkeypatch.setattr("src.services.unified_memory_service.select", MagicMock())
+    monkeypatch.setattr(
+        "src.services.unified_memory_service.Memory",
+        SimpleNamespace(created_at=column("created_at"), importance=column("importance"))
+    )
+    service = UnifiedMemoryService(db_manager=SimpleNamespace(get_session=get_session))
+
+    assert await service.cleanup_old_memories() == 5
+    cache.invalidate.assert_called_once_with()
+    assert session.delete.await_count == 5
+
+
+@pytest.mark.parametrize("workers, max_size", [(None, 10000), ("1", 10000), ("4", 0)])
+def test_shared_cache_is_disabled_for_several_workers(monkeypatch, workers, max_size):
+    monkeypatch.setattr(semantic_cache, "_query_cache", None)
+    if workers is None:
+        monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    else:
+        monkeypatch.setenv("WEB_CONCURRENCY", workers)
+
+    cache = get_query_cache()
+    cache.set_exact("query", "scope", ["result"])
+
+    assert cache.max_size == max_size
+    assert get_query_cache() is cache
+    assert (cache.get_exact("query", "scope") is None) == (max_size == 0)
+
+
+async def test_text_search_is_cached_by_exact_query(search_tools):
+    tools, memory_service, _, _ = search_tools
+
+    await tools.search_memories_tool(agent_id="artemis-optimizer", query="meeting on Tuesday")
+    hit = await tools.search_memories_tool(agent_id="artemis-optimizer", query="Meeting on TUESDAY")
+    miss = await tools.search_memories_tool(agent_id="artemis-optimizer", query="meeting on Wednesday")
+
+    assert hit.get("cached") is True
+    assert "cached" not in miss
+    assert memory_service.search_memories.await_count == 2
+    assert "query_embedding" not in memory_service.search_memories.await_args.kwargs
+    tools.vectorization_service.vectorize_text.assert_not_awaited()
+
+
+async def test_cached_results_are_copies(search_tools):
+    tools, _, _, _ = search_tools
+
+    first = await _search(tools)
+    first["memories"][0]["content"] = "tampered"
+    first["memories"].clear()
+
+    cached = await _search(tools)
+    assert cached["memories"][0]["content"] == "deploy checklist"
+    cached["memories"][0]["content"] = "tampered"
+    assert (await _search(tools))["memories"][0]["content"] == "deploy checklist"
+
+
+async def test_vector_search_passes_the_query_embedding(search_tools):
+    tools, memory_service, _, _ = search_tools
+    tools.vector_search = True
+
+    await _search(tools)
+
+    np.testing.assert_array_equal(
+        memory_service.search_memories.await_args.kwargs["query_embedding"], np.ones(8)
+    )
+    assert (await tools.search_memories_tool(
+        agent_id="artemis-optimizer", query="Deploy checklist!"
+    )).get("cached") is True
+
+
+async def test_served_hits_past_the_retry_window_are_recorded_and_dropped(search_tools, query_cache):
+    tools, _, _, _ = search_tools
+    tools.vector_search = True
+    clock = [1000.0]
+
+    with patch("src.tools.agent_memory_tools.time.monotonic", lambda: clock[0]):
+        for limit in (5, 10, 20):
+            for _ in range(2):
+                await tools.search_memories_tool(agent_id="artemis-optimizer", query="deploy", limit=limit)
+        assert len(tools._served_hits) == 3
+
+        clock[0] += tools.SEARCH_RETRY_WINDOW + 1
+        with patch.object(query_cache, "record_feedback") as record_feedback:
+            await tools.search_memories_tool(agent_id="artemis-optimizer", query="deploy", limit=50)
+
+    assert not tools._served_hits
+    assert [call.kwargs["relevant"] for call in record_feedback.call_args_list] == [True] * 3
+
+
+def test_exact_entries_share_eviction_and_invalidation():
+    cache = SemanticQueryCache(max_size=2, seed=0)
+    cache.set_exact("a", "scope", ["a"])
+    cache.set_exact("a", "scope", ["a2"])
+    cache.set_exact("b", "scope", ["b"])
+    cache.set(np.ones(8), "scope", ["vector"])
+
+    assert cache.get_exact("a", "scope") is None
+    assert cache.get_exact("b", "scope") == ["b"]
+    assert cache.get_exact("b", "other") is None
+
+    assert cache.invalidate(lambda scope: scope == "scope") == 2
+    assert cache.get_exact("b", "scope") is None
+    assert not cache._exact
+
+
+def _unit(rng, dim=64):
+    vector = rng.standard_normal(dim).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_near_duplicate_query_hits_and_unrelated_misses(query_cache):
+    rng = np.random.default_rng(1)
+    query = _unit(rng)
+    query_cache.set(query, "scope", ["result"])
+
+    near_duplicate = query + 0.01 * _unit(rng)
+    assert query_cache.get(near_duplicate, "scope") == ["result"]
+    assert query_cache.get(_unit(rng), "scope") is None
+    assert query_cache.get_stats()["hits"] == 1
+
+
+def test_scopes_are_isolated(query_cache):
+    query = _unit(np.random.default_rng(2))
+    query_cache.set(query, ("athena-conductor", "default"), ["athena"])
+
+    assert query_cache.get(query, ("artemis-optimizer", "default")) is None
+    assert query_cache.get(query, ("athena-conductor", "other")) is None
+    assert query_cache.get(query, ("athena-conductor", "default")) == ["athena"]
+
+
+def test_entries_beyond_max_size_are_evicted_with_their_buckets():
+    cache = SemanticQueryCache(max_size=2, seed=0)
+    rng = np.random.default_rng(3)
+    queries = [_unit(rng) for _ in range(3)]
+    for i, query in enumerate(queries):
+        cache.set(query, "scope", [i])
+
+    assert cache.get_stats()["size"] == 2
+    assert cache.get(queries[0], "scope") is None
+    assert cache.get(queries[2], "scope") == [2]
+    bucketed = set().union(*(ids for table in cache._tables for ids in table.values()))
+    assert bucketed == set(cache._entries)
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = SemanticQueryCache(max_size=2, seed=0)
+    rng = np.random.default_rng(4)
+    first, second, third = (_unit(rng) for _ in range(3))
+    cache.set(first, "scope", ["first"])
+    cache.set(second, "scope", ["second"])
+    assert cache.get(first, "scope") == ["first"]
+
+    cache.set(third, "scope", ["third"])
+
+    assert cache.get(second, "scope") is None
+    assert cache.get(first, "scope") == ["first"]
+
+
+def test_expired_entries_miss(query_cache):
+    query_cache.ttl = 0
+    query = _unit(np.random.default_rng(5))
+    query_cache.set(query, "scope", ["stale"])
+
+    assert query_cache.get(query, "scope") is None
+    assert query_cache.get_stats()["size"] == 0
+
+
+def test_embedding_dimension_change_clears_cache(query_cache):
+    rng = np.random.default_rng(6)
+    old_query = _unit(rng, dim=8)
+    query_cache.set(old_query, "old", ["old"])
+    query_cache.set_exact("text", "exact", ["text"])
+
+    query_cache.set(_unit(rng, dim=16), "new", ["new"])
+
+    stats = query_cache.get_stats()
+    assert stats["size"] == 2
+    assert stats["scopes"] == 2
+    assert query_cache.get_exact("text", "exact") == ["text"]
+    assert query_cache.get(_unit(rng, dim=16), "old") is None
+
+
+def test_invalidate_with_predicate_drops_matching_scopes(query_cache):
+    rng = np.random.default_rng(7)
+    athena, artemis = _unit(rng), _unit(rng)
+    query_cache.set(athena, ("athena-conductor", "default"), ["athena"])
+    query_cache.set(_unit(rng), ("athena-conductor", "other"), ["athena"])
+    query_cache.set(artemis, ("artemis-optimizer", "default"), ["artemis"])
+
+    dropped = query_cache.invalidate(lambda scope: scope[0] == "athena-conductor")
+
+    assert dropped == 2
+    assert query_cache.get(athena, ("athena-conductor", "default")) is None
+    assert query_cache.get(artemis, ("artemis-optimizer", "default")) == ["artemis"]
+    assert all(key[0][0] == "artemis-optimizer" for table in query_cache._tables for key in table)
+
+
+def test_invalidate_without_predicate_drops_everything(query_cache):
+    rng = np.random.default_rng(8)
+    for scope in ("a", "b"):
+        query_cache.set(_unit(rng), scope, [scope])
+
+    assert query_cache.invalidate() == 2
+    assert query_cache.get_stats()["size"] == 0
+    assert all(not table for table in query_cache._tables)
+
+
+def test_retune_maximizes_f1_over_mixed_feedback():
+    cache = SemanticQueryCache(threshold=0.9, retune_every=15, seed=0)
+    for _ in range(8):
+        cache.record_feedback("ns", 0.96, relevant=True)
+    cache.record_feedback("ns", 0.91, relevant=True)
+    for _ in range(6):
+        cache.record_feedback("ns", 0.91, relevant=False)
+
+    # Serving from 0.92 up drops six irrelevant hits for one relevant one
+    assert cache.threshold_for("ns") == pytest.approx(0.92)
+    assert cache.threshold_for("other") == 0.9
+
+
+def test_retune_keeps_threshold_without_relevant_feedback():
+    cache = SemanticQueryCache(threshold=0.9, retune_every=5, seed=0)
+    for _ in range(5):
+        cache.record_feedback("ns", 0.95, relevant=False)
+
+    assert cache.threshold_for("ns") == 0.9
+
+
+def test_retune_never_drops_below_base_threshold():
+    cache = SemanticQueryCache(threshold=0.9, retune_every=4, seed=0)
+    for similarity in (0.5, 0.6, 0.7, 0.95):
+        cache.record_feedback("ns", similarity, relevant=True)
+
+    assert cache.threshold_for("ns") == pytest.approx(0.9)
+
+
+@pytest.mark.parametrize("follow_up, expected", [
+    ("deploy checklist please", [False]),
+    ("quarterly revenue", []),
+])
+async def test_only_similar_follow_up_counts_as_retry(search_tools, query_cache, follow_up, expected):
+    tools, _, _, _ = search_tools
+    tools.vector_search = True
+    embeddings = {
+        "deploy checklist": np.array([1.0, 0.0, 0.0, 0.0], dtype=np.float32),
+        "deploy checklist please": np.array([0.99, 0.05, 0.0, 0.0], dtype=np.float32),
+        "quarterly revenue": np.array([0.0, 0.0, 1.0, 0.0], dtype=np.float32),
+    }
+    tools.vectorization_service.vectorize_text = AsyncMock(side_effect=embeddings.__getitem__)
+
+    await tools.search_memories_tool(agent_id="artemis-optimizer", query="deploy checklist")
+    assert (await tools.search_memories_tool(
+        agent_id="artemis-optimizer", query="deploy checklist"
+    )).get("cached") is True
+
+    with patch.object(query_cache, "record_feedback") as record_feedback:
+        await tools.search_memories_tool(agent_id="artemis-optimizer", query=follow_up)
+
+    assert [call.kwargs["relevant"] for call in record_feedback.call_args_list] == expected
@@ -0,0 +1,45 @@
+"""
+Tests for the statistics service score kernels.
+"""
+
+import numpy as np
+import pytest
+
+from src.services import statistics_service
+from src.services.statistics_service import (
+    _agent_scores,
+    _agent_scores_numpy,
+    _collaboration_scores,
+    _collaboration_scores_numpy,
+)
+
+pytestmark = pytest.mark.skipif(
+    not statistics_service.NUMBA_AVAILABLE, reason="numba kernels not available"
+)
+
+
+def test_agent_scores_match_numpy_with_unknown_response_times():
+    success_rates = np.array([0.9, 0.5, 1.0, 0.2, 0.7, 0.0])
+    health_scores = np.array([1.0, 0.8, 0.6, 0.4, 0.9, 0.3])
+    response_times_ms = np.array([np.nan, 50.0, 250.0, 750.0, 5000.0, np.nan])
+
+    reliability, efficiency = _agent_scores(success_rates, health_scores, response_times_ms)
+    expected_reliability, expected_efficiency = _agent_scores_numpy(
+        success_rates, health_scores, response_times_ms
+    )
+
+    np.testing.assert_allclose(reliability, expected_reliability)
+    np.testing.assert_allclose(efficiency, expected_efficiency)
+    # Unknown response times score neutral, not as slow
+    assert efficiency[0] == efficiency[5] == 0.5
+    assert reliability[0] == pytest.approx((0.9 + 1.0 + 0.5) / 3)
+
+
+def test_collaboration_scores_match_numpy():
+    shared = np.array([0.0, 10.0, 80.0, 200.0])
+    received = np.array([0.0, 0.0, 40.0, 150.0])
+
+    np.testing.assert_allclose(
+        _collaboration_scores(shared, received),
+        _collaboration_scores_numpy(shared, received)
+    )
@@ -0,0 +1,88 @@
+"""
+Tests for batched single-text embedding in the vectorization service.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from src.services import vectorization_service
+from src.services.vectorization_service import VectorizationService
+
+
+def _fake_encode(texts):
+    return np.array([[float(len(text)), 1.0] for text in texts])
+
+
+@pytest.fixture(autouse=True)
+def fake_model():
+    with patch.object(VectorizationService, "_encode", staticmethod(_fake_encode)):
+        yield
+    VectorizationService._pending = {}
+    VectorizationService._pending_loop = None
+    VectorizationService._flush_handle = None
+    VectorizationService._flush_tasks = set()
+
+
+def test_concurrent_single_texts_share_one_batch():
+    service = VectorizationService()
+
+    async def main():
+        return await asyncio.gather(
+            service.vectorize_text("alpha"),
+            service.vectorize_text("be"),
+            service.vectorize_text("alpha")
+        )
+
+    with patch.object(VectorizationService, "_embed_pending", wraps=VectorizationService._embed_pending) as embed:
+        alpha, be, alpha_again = asyncio.run(main())
+
+    assert embed.call_count == 1
+    np.testing.assert_array_equal(alpha, [5.0, 1.0])
+    np.testing.assert_array_equal(be, [2.0, 1.0])
+    np.testing.assert_array_equal(alpha_again, alpha)
+    assert alpha_again is not alpha
+
+
+def test_requests_after_a_loop_stopped_with_a_pending_flush():
+    service = VectorizationService()
+
+    async def cancelled_caller():
+        request = asyncio.ensure_future(service.vectorize_text("abandoned"))
+        await asyncio.sleep(0)
+        request.cancel()
+
+    # The loop closes with the caller cancelled and its flush still scheduled
+    with patch.object(VectorizationService, "BATCH_WINDOW", 60):
+        asyncio.run(cancelled_caller())
+    assert VectorizationService._flush_handle is not None
+
+    async def next_caller():
+        return await asyncio.wait_for(service.vectorize_text("fresh"), timeout=1)
+
+    np.testing.assert_array_equal(asyncio.run(next_caller()), [5.0, 1.0])
+    np.testing.assert_array_equal(asyncio.run(next_caller()), [5.0, 1.0])
+    assert "abandoned" not in VectorizationService._pending
+
+
+def test_concurrent_cold_start_loads_the_model_once(monkeypatch):
+    loads = []
+
+    def slow_model(name):
+        loads.append(name)
+        time.sleep(0.05)
+        return object()
+
+    monkeypatch.setattr(vectorization_service, "SentenceTransformer", slow_model)
+    monkeypatch.setattr(VectorizationService, "_model", None)
+    monkeypatch.setattr(VectorizationService, "_model_name", None)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        models = list(pool.map(lambda _: VectorizationService.get_model(), range(4)))
+
+    assert len(loads) == 1
+    assert all(model is models[0] for model in models)
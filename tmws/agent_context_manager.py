@@ -3,19 +3,38 @@ Agent Context Manager for Trinitas System
 Manages agent switching and context management for multi-agent operations.
 """
 
+import json
 import os
-from typing import Dict, Any, Optional, List
+import re
+import time
+from functools import cache
+from collections import deque
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, List, Tuple
 from datetime import datetime, timezone
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Custom agent identifiers, matched with fullmatch
+_SHORT_NAME_RE = re.compile(r'[a-zA-Z][a-zA-Z0-9\-_]{1,31}')
+_FULL_ID_RE = re.compile(r'[a-zA-Z0-9][a-zA-Z0-9\-_\.]{2,63}')
+
+
+def _freeze_agents(agents: Dict[str, Dict[str, Any]]) -> Mapping[str, Mapping[str, Any]]:
+    """Make an agent registry read-only, with capabilities as tuples."""
+    return MappingProxyType({
+        name: MappingProxyType({**info, "capabilities": tuple(info["capabilities"])})
+        for name, info in agents.items()
+    })
+
 
 class AgentContextManager:
     """Agent context management for dynamic agent switching with custom agent support."""
     
-    # Pre-defined Trinitas agents configuration (immutable default)
-    TRINITAS_AGENTS = {
+    # Pre-defined Trinitas agents configuration (read-only, shared by all
+    # instances; capabilities are tuples)
+    TRINITAS_AGENTS = _freeze_agents({
         "athena": {
             "full_id": "athena-conductor",
             "namespace": "trinitas",
@@ -107,7 +126,10 @@ class AgentContextManager:
             "display_name": "Muses - Knowledge Architect",
             "is_system": True
         }
-    }
+    })
+    
+    # Agent switches remembered per manager (TMWS_AGENT_HISTORY_MAX overrides)
+    AGENT_HISTORY_SIZE = int(os.getenv("TMWS_AGENT_HISTORY_MAX", "16"))
     
     def __init__(self):
         """Initialize the agent context manager with support for custom agents."""
@@ -117,13 +139,23 @@ class AgentContextManager:
         # Combined registry (Trinitas + custom)
         self.all_agents = self.TRINITAS_AGENTS.copy()
         
+        # Built listing, reset whenever the registry changes
+        self._agent_listing: Optional[List[Dict[str, Any]]] = None
+        
+        # full_id -> (short name, info), kept in step with all_agents
+        self._by_full_id: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        # full_id -> read-only info merged with short_name, built on first lookup
+        self._full_id_views: Dict[str, Mapping[str, Any]] = {}
+        self._index_agents()
+        
         # Default agent from environment variable or fallback to athena
-        default_agent_env = os.getenv("TMWS_AGENT_ID", "athena-conductor")
-        self.default_agent = self._normalize_agent_id(default_agent_env)
+        self.default_agent = _resolve_default_agent()
         self.current_agent = self.default_agent
-        self.agent_history: List[Dict[str, Any]] = []
+        # Only the most recent switches are kept
+        self.agent_history: deque = deque(maxlen=self.AGENT_HISTORY_SIZE)
         self.switch_count = 0
         self.session_start = datetime.now(timezone.utc)
+        self._session_start_monotonic = time.monotonic()
         
         # Load custom agents from config if exists
         self._load_custom_agents_from_config()
@@ -131,6 +163,13 @@ class AgentContextManager:
         logger.info(f"AgentContextManager initialized with default agent: {self.current_agent}")
         logger.info(f"Available agents: {len(self.all_agents)} (Trinitas: 6, Custom: {len(self.custom_agents)})")
     
+    def _index_agents(self) -> None:
+        """Rebuild the full_id index; the first agent registered with a full_id wins."""
+        self._by_full_id = {}
+        self._full_id_views = {}
+        for name, info in self.all_agents.items():
+            self._by_full_id.setdefault(info["full_id"], (name, info))
+    
     def _load_custom_agents_from_config(self):
         """Load custom agents from configuration file if exists."""
         config_paths = [
@@ -143,7 +182,6 @@ class AgentContextManager:
             if os.path.exists(config_path):
                 try:
                     with open(config_path, 'r') as f:
-                        import json
                         config = json.load(f)
                         if "custom_agents" in config:
                             for agent in config["custom_agents"]:
@@ -183,16 +221,14 @@ class AgentContextManager:
         Returns:
             Registration result with success status
         """
-        import re
-        
         # Validation
-        if not re.match(r'^[a-zA-Z][a-zA-Z0-9\-_]{1,31}$', short_name):
+        if not _SHORT_NAME_RE.fullmatch(short_name):
             return {
                 "success": False,
                 "error": "Invalid agent name. Must start with letter, alphanumeric with hyphens/underscores, 2-32 chars"
             }
         
-        if not re.match(r'^[a-zA-Z0-9][a-zA-Z0-9\-_\.]{2,63}$', full_id):
+        if not _FULL_ID_RE.fullmatch(full_id):
             return {
                 "success": False,
                 "error": "Invalid full ID. Must be alphanumeric with hyphens/underscores/dots, 3-64 chars"
@@ -226,6 +262,8 @@ class AgentContextManager:
         
         self.custom_agents[short_name] = agent_config
         self.all_agents[short_name] = agent_config
+        self._agent_listing = None
+        self._by_full_id.setdefault(full_id, (short_name, agent_config))
         
         logger.info(f"Registered custom agent: {short_name} ({full_id})")
         
@@ -261,6 +299,8 @@ class AgentContextManager:
         # Remove the agent
         agent_info = self.custom_agents.pop(short_name)
         self.all_agents.pop(short_name)
+        self._agent_listing = None
+        self._index_agents()
         
         # If current agent is the one being unregistered, switch to default
         if self.current_agent == agent_info["full_id"]:
@@ -285,8 +325,6 @@ class AgentContextManager:
         Returns:
             Save result
         """
-        import json
-        
         if not filepath:
             filepath = "custom_agents.json"
         
@@ -297,8 +335,10 @@ class AgentContextManager:
                 "custom_agents": list(self.custom_agents.values())
             }
             
+            # Serialize up front so the file is written in a single call
+            data = json.dumps(config, indent=2)
             with open(filepath, 'w') as f:
-                json.dump(config, f, indent=2)
+                f.write(data)
             
             logger.info(f"Saved {len(self.custom_agents)} custom agents to {filepath}")
             
@@ -329,9 +369,8 @@ class AgentContextManager:
             return self.all_agents[agent_id]["full_id"]
         
         # Check if it's already a full ID
-        for agent_info in self.all_agents.values():
-            if agent_info["full_id"] == agent_id:
-                return agent_id
+        if agent_id in self._by_full_id:
+            return agent_id
         
         # Default to the input if not recognized
         logger.warning(f"Unknown agent ID: {agent_id}, using as-is")
@@ -345,9 +384,10 @@ class AgentContextManager:
             agent_name: Short agent name
             
         Returns:
-            Agent information dictionary or None if not found
+            Agent information dictionary (a copy) or None if not found
         """
-        return self.all_agents.get(agent_name)
+        info = self.all_agents.get(agent_name)
+        return dict(info) if info is not None else None
     
     def switch_agent(self, agent_name: str) -> Dict[str, Any]:
         """
@@ -373,7 +413,7 @@ class AgentContextManager:
         self.agent_history.append({
             "from_agent": previous_agent,
             "to_agent": agent_info["full_id"],
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
             "switch_count": self.switch_count
         })
         
@@ -402,11 +442,8 @@ class AgentContextManager:
             Current agent context dictionary
         """
         # Find current agent info
-        current_info = None
-        for name, info in self.all_agents.items():
-            if info["full_id"] == self.current_agent:
-                current_info = info
-                break
+        entry = self._by_full_id.get(self.current_agent)
+        current_info = entry[1] if entry else None
         
         if not current_info:
             # Not a known agent, return basic info
@@ -414,7 +451,7 @@ class AgentContextManager:
                 "current_agent": self.current_agent,
                 "is_trinitas_agent": False,
                 "is_custom_agent": False,
-                "history": self.agent_history[-5:] if self.agent_history else []
+                "history": list(self.agent_history)[-5:]
             }
         
         return {
@@ -426,11 +463,11 @@ class AgentContextManager:
             "is_trinitas_agent": current_info.get("is_system", False),
             "is_custom_agent": not current_info.get("is_system", False),
             "switch_count": self.switch_count,
-            "session_duration": (datetime.now(timezone.utc) - self.session_start).total_seconds(),
-            "history": self.agent_history[-5:] if self.agent_history else []
+            "session_duration": time.monotonic() - self._session_start_monotonic,
+            "history": list(self.agent_history)[-5:]
         }
     
-    def get_agent_by_full_id(self, full_id: str) -> Optional[Dict[str, Any]]:
+    def get_agent_by_full_id(self, full_id: str) -> Optional[Mapping[str, Any]]:
         """
         Get agent information by full ID.
         
@@ -438,32 +475,38 @@ class AgentContextManager:
             full_id: Full agent ID
             
         Returns:
-            Agent information or None if not found
+            Read-only agent information or None if not found
         """
-        for name, info in self.all_agents.items():
-            if info["full_id"] == full_id:
-                return {**info, "short_name": name}
-        return None
+        view = self._full_id_views.get(full_id)
+        if view is None:
+            entry = self._by_full_id.get(full_id)
+            if entry is None:
+                return None
+            name, info = entry
+            view = self._full_id_views[full_id] = MappingProxyType({**info, "short_name": name})
+        return view
     
     def list_available_agents(self) -> List[Dict[str, Any]]:
         """
         List all available agents (Trinitas + custom).
         
         Returns:
-            List of agent information dictionaries
+            List of agent information dictionaries (shared; do not modify)
         """
-        agents = []
-        for name, info in self.all_agents.items():
-            agents.append({
-                "name": name,
-                "full_id": info["full_id"],
-                "display_name": info.get("display_name", name),
-                "capabilities": info["capabilities"],
-                "access_level": info["access_level"],
-                "is_system": info.get("is_system", False),
-                "namespace": info["namespace"]
-            })
-        return agents
+        if self._agent_listing is None:
+            self._agent_listing = [
+                {
+                    "name": name,
+                    "full_id": info["full_id"],
+                    "display_name": info.get("display_name", name),
+                    "capabilities": info["capabilities"],
+                    "access_level": info["access_level"],
+                    "is_system": info.get("is_system", False),
+                    "namespace": info["namespace"]
+                }
+                for name, info in self.all_agents.items()
+            ]
+        return list(self._agent_listing)
     
     def reset_to_default(self) -> str:
         """
@@ -474,4 +517,23 @@ class AgentContextManager:
         """
         self.current_agent = self.default_agent
         logger.info(f"Reset to default agent: {self.default_agent}")
-        return self.default_agent
\ No newline at end of file
+        return self.default_agent
+
+
+@cache
+def _resolve_default_agent() -> str:
+    """
+    Resolve TMWS_AGENT_ID to a full agent ID, once per process.
+
+    Custom agents are loaded after the default is chosen, so only the
+    Trinitas agents are consulted. Call cache_clear() to pick up a changed
+    environment.
+    """
+    agent_id = os.getenv("TMWS_AGENT_ID", "athena-conductor")
+    agents = AgentContextManager.TRINITAS_AGENTS
+    if agent_id in agents:
+        return agents[agent_id]["full_id"]
+    if any(info["full_id"] == agent_id for info in agents.values()):
+        return agent_id
+    logger.warning(f"Unknown agent ID: {agent_id}, using as-is")
+    return agent_id
@@ -554,7 +554,9 @@ async def save_agent_profiles(filepath: Optional[str] = None) -> Dict[str, Any]:
             "error": "Agent manager not initialized"
         }
     
-    return context.agent_manager.save_custom_agents(filepath)
+    # File I/O runs in the default executor so it doesn't block the event loop
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, context.agent_manager.save_custom_agents, filepath)
 
 
 @mcp.tool()